@@ -6,35 +6,40 @@ SpeechRecognition STT + Cartesia Sonic 3 TTS
 import os
 import io
 import time
+import asyncio
 import argparse
-import numpy as np
 import gradio as gr
-import speech_recognition as sr
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from loguru import logger
-import re
 from cartesia import Cartesia
 from fastrtc import AlgoOptions, ReplyOnPause, Stream
-from scripts.agent import agent, agent_config
+from scripts.agent import agent_config, agent_ready, get_agent, warm_agent
+from services.audio_preprocess import preprocess_for_stt
+from services.pcm_framer import PCMFramer
+from services.sentence_stream import SentenceChunker, iterate_in_thread
+from services.tts_sanitizer import TTSSanitizer, clean_text_for_tts
+from services.stt_service import stt_service
+from services.tool_executor import format_tool_timings, tool_executor
+from services import metrics
+from services.log_config import configure_logging
 
 load_dotenv()
 
 # ----------------------------- CLEAN + COLORED LOGGER ---------------------------------
 
-logger.remove()
+# Non-blocking, per-subsystem leveled handler (LOG_LEVEL / LOG_LEVELS / LOG_FORMAT=json)
+configure_logging()
 
-WANTED = ["🎙", "👂", "💬", "🔊", "⚡"]
-
-def filter_logs(record):
-    return any(e in record["message"] for e in WANTED)
-
-logger.add(
-    lambda msg: print(msg),
-    level="INFO",
-    filter=filter_logs,
-    format="<green>{time:HH:mm:ss}</green> | {message}",
-)
+# Metric series for this process, resolved once so the streaming path only observes
+LLM_FIRST_CHUNK = metrics.LLM_FIRST_CHUNK_SECONDS.labels(pipeline="voice")
+LLM_TIME = metrics.LLM_SECONDS.labels(pipeline="voice")
+TURN_TIME = metrics.TURN_SECONDS.labels(pipeline="voice")
+TURNS = metrics.TURNS.labels(pipeline="voice")
+OUTPUT_TOKENS = metrics.LLM_OUTPUT_TOKENS.labels(pipeline="voice")
+STT_ERRORS = metrics.ERRORS.labels(pipeline="voice", stage="stt")
+TURN_ERRORS = metrics.ERRORS.labels(pipeline="voice", stage="turn")
 
 # Color helper
 CYAN   = "\033[96m"
@@ -44,28 +49,15 @@ GREEN = "\033[92m"
 RED = "\033[91m"
 RESET = "\033[0m"
 
-# ----------------------------- TEXT CLEANER FOR TTS ------------------------------------
-
-def clean_text_for_tts(text: str) -> str:
-    """
-    Clean markdown formatting for better TTS output.
-    """
-    clean_text = text
-    clean_text = re.sub(r'\*+', '', clean_text)
-    clean_text = re.sub(r'[#_`]', '', clean_text)
-    clean_text = re.sub(r'-{2,}', ' ', clean_text)
-    clean_text = re.sub(r'\|', ' ', clean_text)
-    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-    return clean_text
-
 # ----------------------------- INIT CLIENTS --------------------------------------------
 
-logger.info(f"{CYAN}🎙 Initializing SpeechRecognition + Cartesia Sonic-3 TTS..{RESET}")
-
-recognizer = sr.Recognizer()
+logger.info(f"{CYAN}🎙 Initializing {stt_service.engine.name} STT + Cartesia Sonic-3 TTS..{RESET}")
 
 cartesia_client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
 
+# The agent (model client, tool modules, graph) builds in the background while Gradio starts
+warm_agent()
+
 CARTESIA_TTS_CONFIG = {
     "model_id": "sonic-3",
     "voice": {
@@ -79,30 +71,33 @@ CARTESIA_TTS_CONFIG = {
     },
 }
 
+# Speak each sentence as soon as the LLM finishes it instead of waiting for the full reply
+STREAMING_TTS = os.getenv("VOICE_STREAMING_TTS", "true").lower() in ("1", "true", "yes")
+
+# Fixed output frame duration for FastRTC; 0 forwards each Cartesia chunk as-is
+TTS_FRAME_MS = float(os.getenv("VOICE_TTS_FRAME_MS", "0"))
+
 # ----------------------------- FUNCTIONS ------------------------------------
 
 def stt_transcribe(audio):
     """
-    Convert audio → text (SpeechRecognition STT)
+    Convert audio → text via the configured STT engine (thread pool + timeout).
     """
     sample_rate, audio_array = audio
 
-    if audio_array.dtype == np.float32:
-        audio_int16 = (audio_array * 32767).astype(np.int16)
-    else:
-        audio_int16 = audio_array.astype(np.int16)
-
-    if audio_int16.ndim > 1:
-        audio_int16 = audio_int16.flatten()
-
-    audio_bytes = audio_int16.tobytes()
-    audio_data = sr.AudioData(audio_bytes, sample_rate, 2)
-
-    try:
-        return recognizer.recognize_google(audio_data)
-    except:
+    # Mono, clipped, resampled to the engine's native rate, silence trimmed
+    audio_int16, sample_rate = preprocess_for_stt(
+        audio_array, sample_rate, stt_service.engine.sample_rate
+    )
+    if audio_int16.size == 0:
         return ""
 
+    result = stt_service.transcribe(audio_int16, sample_rate)
+    if not result.ok:
+        # stt_service already logged the failure
+        STT_ERRORS.inc()
+    return result.text
+
 def generate_speech(text):
     iter_chunks = cartesia_client.tts.bytes(
         model_id=CARTESIA_TTS_CONFIG["model_id"],
@@ -111,32 +106,134 @@ def generate_speech(text):
         output_format=CARTESIA_TTS_CONFIG["output_format"],
     )
 
-    buffer = b""
-    element_size = 4
     sample_rate = CARTESIA_TTS_CONFIG["output_format"]["sample_rate"]
+    framer = PCMFramer(sample_rate, frame_ms=TTS_FRAME_MS)
+
+    yield from framer.frames(iter_chunks)
 
-    for chunk in iter_chunks:
-        buffer += chunk
-        n = len(buffer) // element_size
+async def stream_reply_sentences(transcript):
+    """
+    Stream the agent's reply and yield it sentence by sentence (or clause by clause).
+    """
+    # Markdown is cleaned on the token stream, so sentences come out ready to speak
+    sanitizer = TTSSanitizer()
+    chunker = SentenceChunker()
+    start = time.time()
+    chunk_count = 0
 
-        if n:
-            size = n * element_size
-            block = buffer[:size]
-            buffer = buffer[size:]
+    # Runs on the shared background loop: wait for an unfinished warm-up off the loop
+    agent = get_agent() if agent_ready() else await asyncio.to_thread(get_agent)
+    async for event in agent.astream_events(
+        {"messages": [{"role": "user", "content": transcript}]},
+        config=agent_config,
+        version="v1",
+    ):
+        if event["event"] == "on_chat_model_stream":
+            content = event["data"]["chunk"].content
+            if content:
+                if chunk_count == 0:
+                    LLM_FIRST_CHUNK.observe(time.time() - start)
+                chunk_count += 1
+                for sentence in chunker.feed(sanitizer.feed(content)):
+                    yield sentence
+
+    OUTPUT_TOKENS.inc(chunk_count)
+    for sentence in chunker.feed(sanitizer.flush()) + chunker.flush():
+        yield sentence
+
+def log_turn_performance(start_time, stt_time, llm_time, tts_start, first_audio_time, chunk_count, tool_timings):
+    """
+    Observe one voice turn's latency metrics and write its ⚡ Performance line.
+    Shared by the streaming and blocking paths so both report the same fields.
+    """
+    end_time = time.time()
+    tts_time = end_time - tts_start if tts_start else 0.0
+    ttfa = first_audio_time - start_time if first_audio_time else 0.0
+    total_time = end_time - start_time
 
-            arr = np.frombuffer(block, dtype=np.float32)
-            yield (sample_rate, arr)
+    LLM_TIME.observe(llm_time)
+    TURN_TIME.observe(total_time)
+    if first_audio_time:
+        metrics.TTS_FIRST_BYTE_SECONDS.observe(first_audio_time - tts_start)
 
-    if buffer:
-        rem = len(buffer) % element_size
-        if rem:
-            buffer += b"\x00" * (element_size - rem)
-        arr = np.frombuffer(buffer, dtype=np.float32)
-        yield (sample_rate, arr)
+    # --- PERFORMANCE LOG ---
+    logger.bind(
+        event="turn",
+        pipeline="voice",
+        stt_s=round(stt_time, 3),
+        llm_s=round(llm_time, 3),
+        tts_s=round(tts_time, 3),
+        ttfa_s=round(ttfa, 3),
+        total_s=round(total_time, 3),
+        chunks=chunk_count,
+        tools={t.name: round(t.seconds, 3) for t in tool_timings},
+    ).info(
+        f"{CYAN}⚡ Performance:{RESET} "
+        f"{YELLOW}STT={stt_time:.2f}s{RESET} | "
+        f"{MAGENTA}LLM={llm_time:.2f}s{RESET} | "
+        f"{GREEN}TTS={tts_time:.2f}s{RESET} | "
+        f"{GREEN}TTFA={ttfa:.2f}s{RESET} | "
+        f"{CYAN}Total={total_time:.2f}s{RESET} | "
+        f"{RED}Chunks={chunk_count}{RESET}"
+        + (f" | {YELLOW}Tools: {format_tool_timings(tool_timings)}{RESET}" if tool_timings else "")
+    )
 
 # ----------------------------- MAIN PIPELINE ------------------------------------
 
 def response(audio):
+    TURNS.inc()
+    try:
+        if STREAMING_TTS:
+            yield from response_streaming(audio)
+        else:
+            yield from response_blocking(audio)
+    except Exception:
+        TURN_ERRORS.inc()
+        raise
+
+def response_streaming(audio):
+    start_time = time.time()
+    logger.info(f"{CYAN}🎙 Received audio input{RESET}")
+
+    # --- STT ---
+    stt_start = time.time()
+    transcript = stt_transcribe(audio)
+    stt_time = time.time() - stt_start
+    metrics.STT_SECONDS.observe(stt_time)
+
+    logger.info(f'{YELLOW}👂 Transcribed: "{transcript}"{RESET}')
+
+    if not transcript.strip():
+        return
+
+    # --- LLM + TTS (overlapped) ---
+    llm_start = time.time()
+    tts_start = None
+    first_audio_time = None
+    chunk_count = 0
+    sentences = []
+
+    with tool_executor.collect() as tool_timings:
+        for sentence in iterate_in_thread(lambda: stream_reply_sentences(transcript)):
+            sentences.append(sentence)
+
+            if tts_start is None:
+                tts_start = time.time()
+                logger.info(f"{GREEN}🔊 Speaking...{RESET}")
+
+            for chunk in generate_speech(sentence):
+                if first_audio_time is None:
+                    first_audio_time = time.time()
+                chunk_count += 1
+                yield chunk
+
+    # LLM and TTS overlap: the reply is still being generated while earlier sentences play
+    llm_time = time.time() - llm_start
+    logger.info(f'{MAGENTA}💬 Response: "{" ".join(sentences)}"{RESET}')
+
+    log_turn_performance(start_time, stt_time, llm_time, tts_start, first_audio_time, chunk_count, tool_timings)
+
+def response_blocking(audio):
     start_time = time.time()
     logger.info(f"{CYAN}🎙 Received audio input{RESET}")
 
@@ -144,6 +241,7 @@ def response(audio):
     stt_start = time.time()
     transcript = stt_transcribe(audio)
     stt_time = time.time() - stt_start
+    metrics.STT_SECONDS.observe(stt_time)
 
     logger.info(f'{YELLOW}👂 Transcribed: "{transcript}"{RESET}')
 
@@ -152,10 +250,11 @@ def response(audio):
 
     # --- LLM ---
     llm_start = time.time()
-    agent_reply = agent.invoke(
-        {"messages": [{"role": "user", "content": transcript}]},
-        config=agent_config,
-    )
+    with tool_executor.collect() as tool_timings:
+        agent_reply = get_agent().invoke(
+            {"messages": [{"role": "user", "content": transcript}]},
+            config=agent_config,
+        )
 
     reply_raw = agent_reply["messages"][-1].content
     llm_time = time.time() - llm_start
@@ -171,22 +270,15 @@ def response(audio):
     tts_start = time.time()
     chunk_count = 0
 
+    first_audio_time = None
+
     for chunk in generate_speech(reply_clean):
+        if first_audio_time is None:
+            first_audio_time = time.time()
         chunk_count += 1
         yield chunk
 
-    tts_time = time.time() - tts_start
-    total_time = time.time() - start_time
-
-    # --- PERFORMANCE LOG ---
-    logger.info(
-        f"{CYAN}⚡ Performance:{RESET} "
-        f"{YELLOW}STT={stt_time:.2f}s{RESET} | "
-        f"{MAGENTA}LLM={llm_time:.2f}s{RESET} | "
-        f"{GREEN}TTS={tts_time:.2f}s{RESET} | "
-        f"{CYAN}Total={total_time:.2f}s{RESET} | "
-        f"{RED}Chunks={chunk_count}{RESET}"
-    )
+    log_turn_performance(start_time, stt_time, llm_time, tts_start, first_audio_time, chunk_count, tool_timings)
 
 # ----------------------------- STREAM SETUP ------------------------------------
 
@@ -202,6 +294,13 @@ def create_stream():
 
 stream = create_stream()
 app = FastAPI()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus scrape endpoint (when served through this FastAPI app, e.g. `uvicorn app:app`)."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Registered before the Gradio mount so "/" does not shadow /metrics
 app = gr.mount_gradio_app(app, stream.ui, path="/")
 
 # ----------------------------- MAIN ------------------------------------
@@ -213,6 +312,10 @@ if __name__ == "__main__":
 
     os.environ["GRADIO_SSR_MODE"] = "false"
 
+    # Gradio/fastphone run their own server; opt in to /metrics on a side port with VOICE_METRICS_PORT
+    if metrics.VOICE_METRICS_PORT:
+        metrics.start_metrics_server(metrics.VOICE_METRICS_PORT)
+
     if args.phone:
         stream.fastphone(host="0.0.0.0", port=7860)
     else:
@@ -1,34 +1,43 @@
+import asyncio
 import json
 import os
 import time
-import re
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from loguru import logger
 
 # Import the existing agent
-from scripts.agent import agent, agent_config
+from scripts.agent import agent_ready, build_agent_config, get_agent, get_memory, warm_agent
+from services.history_sync import select_new_messages, stored_reply
+from services.retriever_service import retriever_service
+from services.tool_executor import format_tool_timings, tool_executor
+from services import metrics
+from services.log_config import configure_logging
+from services.tts_sanitizer import TTSSanitizer
 
 load_dotenv()
 
+# "delta": append only messages the checkpointed thread has not seen; "full": old resend-everything behaviour
+HISTORY_MODE = os.getenv("HISTORY_MODE", "delta")
+
 # -------------------------------
 # Logger Configuration
 # -------------------------------
-WANTED = ["🎙", "👂", "💬", "🔊", "⚡"]
-
-def filter_logs(record):
-    return any(e in record["message"] for e in WANTED)
-
-logger.add(
-    lambda msg: print(msg),
-    level="INFO",
-    filter=filter_logs,
-    format="<green>{time:HH:mm:ss}</green> | {message}",
-)
+# Non-blocking, per-subsystem leveled handler (LOG_LEVEL / LOG_LEVELS / LOG_FORMAT=json)
+configure_logging()
+
+# Metric series for this process, resolved once so the streaming path only observes
+LLM_FIRST_CHUNK = metrics.LLM_FIRST_CHUNK_SECONDS.labels(pipeline="backend")
+LLM_TIME = metrics.LLM_SECONDS.labels(pipeline="backend")
+TURN_TIME = metrics.TURN_SECONDS.labels(pipeline="backend")
+TURNS = metrics.TURNS.labels(pipeline="backend")
+SESSIONS = metrics.SESSIONS.labels(pipeline="backend")
+LLM_ERRORS = metrics.ERRORS.labels(pipeline="backend", stage="llm")
+OUTPUT_TOKENS = metrics.LLM_OUTPUT_TOKENS.labels(pipeline="backend")
 
 # Color helper
 CYAN   = "\033[96m"
@@ -38,21 +47,6 @@ GREEN = "\033[92m"
 RED = "\033[91m"
 RESET = "\033[0m"
 
-# -------------------------------
-# TEXT CLEANER FOR TTS
-# -------------------------------
-def clean_text_for_tts(text: str) -> str:
-    """
-    Clean markdown formatting for better TTS output.
-    """
-    clean_text = text
-    clean_text = re.sub(r'\*+', '', clean_text)
-    clean_text = re.sub(r'[#_`]', '', clean_text)
-    clean_text = re.sub(r'-{2,}', ' ', clean_text)
-    clean_text = re.sub(r'\|', ' ', clean_text)
-    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-    return clean_text
-
 # -------------------------------
 # Pydantic Models
 # -------------------------------
@@ -81,17 +75,50 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+@app.on_event("startup")
+async def warm_retriever():
+    """Build the agent in the background and load the embedding model and Chroma before the first RAG question."""
+    warm_agent()
+    try:
+        await asyncio.to_thread(retriever_service.warm)
+    except Exception as e:
+        logger.error(f"Retriever warm-up failed: {e}")
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/sessions/storage")
+async def sessions_storage():
+    """Resident memory and per-thread on-disk size of the conversation checkpointer."""
+    memory = get_memory()
+    if not hasattr(memory, "storage_report"):
+        return {"checkpointer": type(memory).__name__}
+    return await asyncio.to_thread(memory.storage_report)
+
+@app.get("/rag/metrics")
+async def rag_metrics():
+    """Embedding model load and RAG query timings."""
+    return retriever_service.metrics()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: pipeline latency histograms, turn/session/error/token counters and tool metrics."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/metrics/tools")
+async def tool_metrics():
+    """Per-tool latency histograms, outcome counts (ok/error/timeout/fallback) and cache hit rates as JSON."""
+    return tool_executor.stats()
+
 @app.post("/llm/stream")
 async def llm_stream(
     payload: ChatRequest,
     session_id: str = Query(..., description="Session ID (Thread ID)"),
+    tts: bool = Query(True, description="Clean markdown for speech; the chat page passes false to keep it"),
 ):
     """
-    Streaming LLM endpoint for Anam.
+    Streaming LLM endpoint for Anam and the Streamlit chat page.
     Invokes the local LangChain agent and streams the response token by token (simulated or real).
     """
     messages = payload.messages
@@ -107,6 +134,8 @@ async def llm_stream(
         chunk_count = 0
         llm_start_time = time.time()
         first_chunk_time = None
+        sanitizer = TTSSanitizer() if tts else None
+        TURNS.inc()
         
         try:
             # Convert messages to LangChain format
@@ -115,51 +144,92 @@ async def llm_stream(
                 for m in messages
             ]
             
-            logger.info(f"👂 Processing {len(langchain_messages)} messages, last: {user_message[:50]}...")
+            # Per-request configuration bound to this session's thread
+            config = build_agent_config(session_id)
+            # Built at startup in the background; a request arriving earlier waits off the event loop
+            agent = get_agent() if agent_ready() else await asyncio.to_thread(get_agent)
+
+            # The checkpointer already holds this thread's history; only append what is new
+            if HISTORY_MODE == "delta":
+                state = await agent.aget_state(config)
+                thread_messages = state.values.get("messages", [])
+                if not thread_messages:
+                    SESSIONS.inc()
+                langchain_messages = select_new_messages(langchain_messages, thread_messages)
+                # A retry after the reply was checkpointed: send the stored reply, don't answer twice
+                reply = stored_reply(thread_messages) if not langchain_messages else None
+                if reply is not None:
+                    logger.info(f"🔁 Retried turn for {session_id}; replaying the stored reply")
+                    cleaned_content = (sanitizer.feed(reply) + sanitizer.flush()) if sanitizer else reply
+                    if cleaned_content:
+                        yield f"data: {json.dumps({'content': cleaned_content})}\n\n"
+                    return
             
-            # Prepare configuration with session_id
-            config = agent_config.copy()
-            config["configurable"]["thread_id"] = session_id
-
-            # Streaming events with full message history
-            async for event in agent.astream_events(
-                {"messages": langchain_messages},
-                config=config,
-                version="v1",
-            ):
-                kind = event["event"]
+            # Formatted only when DEBUG is enabled for this module
+            logger.debug(
+                "👂 Processing {} of {} messages, last: {:.50}...",
+                len(langchain_messages), len(messages), user_message,
+            )
+
+            with tool_executor.collect() as tool_timings:
+                async for event in agent.astream_events(
+                    {"messages": langchain_messages},
+                    config=config,
+                    version="v1",
+                ):
+                    kind = event["event"]
                 
-                # We are interested in 'on_chat_model_stream' events from the final LLM response
-                # But since it's an agent, it might call tools first.
-                # Simplest for Anam: Stream the final answer chunks.
+                    # We are interested in 'on_chat_model_stream' events from the final LLM response
+                    # But since it's an agent, it might call tools first.
+                    # Simplest for Anam: Stream the final answer chunks.
                 
-                if kind == "on_chat_model_stream":
-                    content = event["data"]["chunk"].content
-                    if content:
-                        if first_chunk_time is None:
-                            first_chunk_time = time.time()
-                            ttft = first_chunk_time - llm_start_time
-                            logger.info(f"💬 First chunk received in {YELLOW}{ttft:.2f}s{RESET}")
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            if first_chunk_time is None:
+                                first_chunk_time = time.time()
+                                ttft = first_chunk_time - llm_start_time
+                                LLM_FIRST_CHUNK.observe(ttft)
+                                logger.info(f"💬 First chunk received in {YELLOW}{ttft:.2f}s{RESET}")
                         
-                        chunk_count += 1
-                        # Clean markdown formatting for TTS
-                        cleaned_content = clean_text_for_tts(content)
-                        payload = json.dumps({"content": cleaned_content})
-                        yield f"data: {payload}\n\n"
+                            chunk_count += 1
+                            # Clean markdown for TTS; markup split across chunks is held until complete
+                            cleaned_content = sanitizer.feed(content) if sanitizer else content
+                            if cleaned_content:
+                                payload = json.dumps({"content": cleaned_content})
+                                yield f"data: {payload}\n\n"
+
+            cleaned_content = sanitizer.flush() if sanitizer else ""
+            if cleaned_content:
+                payload = json.dumps({"content": cleaned_content})
+                yield f"data: {payload}\n\n"
             
             # Log performance metrics
             llm_end_time = time.time()
             llm_time = llm_end_time - llm_start_time
+            LLM_TIME.observe(llm_time)
+            TURN_TIME.observe(llm_time)
+            OUTPUT_TOKENS.inc(chunk_count)
             
-            logger.info(
+            logger.bind(
+                event="turn",
+                pipeline="backend",
+                session_id=session_id,
+                llm_s=round(llm_time, 3),
+                ttft_s=round(first_chunk_time - llm_start_time, 3) if first_chunk_time else None,
+                chunks=chunk_count,
+                tools={t.name: round(t.seconds, 3) for t in tool_timings},
+            ).info(
                 f"{CYAN}⚡ Performance:{RESET} "
                 f"{MAGENTA}LLM={llm_time:.2f}s{RESET} | "
                 f"{RED}Chunks={chunk_count}{RESET}"
+                + (f" | {YELLOW}Tools: {format_tool_timings(tool_timings)}{RESET}" if tool_timings else "")
             )
 
         except Exception as e:
+            LLM_ERRORS.inc()
             logger.error(f"🔊 Error: {str(e)}")
-            err_payload = json.dumps({"content": f"Error: {str(e)}"})
+            err_payload = json.dumps({"content": f"Error: {str(e)}", "error": str(e)})
             yield f"data: {err_payload}\n\n"
 
     return StreamingResponse(
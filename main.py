@@ -5,6 +5,17 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from services.anam_service import anam_service, VIDEO_AGENT_PERSONA
+from services.metrics import STREAMLIT_METRICS_PORT, ensure_metrics_server
+from services.session_token_pool import session_token_pool
+
+# Start pre-minting Anam session tokens so the Video Agent page opens without waiting on the API
+session_token_pool.warm(anam_service.build_persona_payload(**VIDEO_AGENT_PERSONA))
+
+# Token pool hit rate and time-to-token on /metrics; started once, later reruns reuse it
+if STREAMLIT_METRICS_PORT:
+    ensure_metrics_server(STREAMLIT_METRICS_PORT)
+
 # Page configuration
 st.set_page_config(
     page_title="Samantha",
@@ -1,5 +1,21 @@
+import os
 import streamlit as st
-from scripts.agent import agent, agent_config
+from services.llm_stream_client import StreamTiming, stream_reply
+
+# Conversation thread on the backend (same default thread the page used with the in-process agent)
+CHAT_SESSION_ID = os.getenv("CHAT_SESSION_ID", "default_user")
+
+
+def format_timing(timing: dict) -> str:
+    parts = []
+    if timing.get("ttft") is not None:
+        parts.append(f"first token {timing['ttft']:.2f}s")
+    if timing.get("total") is not None:
+        parts.append(f"total {timing['total']:.2f}s")
+    if timing.get("source") and timing["source"] != "backend":
+        parts.append(timing["source"])
+    return "⚡ " + " · ".join(parts)
+
 
 # Initialize session state
 if "messages" not in st.session_state:
@@ -12,6 +28,8 @@ if "processing" not in st.session_state:
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
+        if message.get("timing"):
+            st.caption(format_timing(message["timing"]))
 
 # Chat input at the bottom
 if prompt := st.chat_input("Ask me anything...", key="chat_input"):
@@ -20,30 +38,29 @@ if prompt := st.chat_input("Ask me anything...", key="chat_input"):
         
         # Add user message to history
         st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
         
-        try:
-            # Convert session state messages to LangChain format
-            langchain_messages = [
-                {"role": msg["role"], "content": msg["content"]} 
-                for msg in st.session_state.messages
-            ]
-            
-            # Invoke agent with full conversation history
-            agent_reply = agent.invoke(
-                {"messages": langchain_messages},
-                config=agent_config,
-            )
-            
-            # Extract only the final assistant response content
-            final_message = agent_reply["messages"][-1]
-            if hasattr(final_message, 'content'):
-                response = final_message.content
-            else:
-                response = str(final_message)
+        # Client-held history; the backend only appends what its checkpointed thread has not seen
+        langchain_messages = [
+            {"role": msg["role"], "content": msg["content"]} 
+            for msg in st.session_state.messages
+        ]
+        
+        timing = StreamTiming()
+        with st.chat_message("assistant"):
+            try:
+                # Render tokens as they arrive from the backend's /llm/stream SSE endpoint
+                response = st.write_stream(stream_reply(langchain_messages, CHAT_SESSION_ID, timing))
+                if not isinstance(response, str):
+                    response = "".join(str(part) for part in response)
+            except Exception as e:
+                response = f"❌ Error: {str(e)}"
+                st.markdown(response)
             
-            st.session_state.messages.append({"role": "assistant", "content": response})
-        except Exception as e:
-            st.session_state.messages.append({"role": "assistant", "content": f"❌ Error: {str(e)}"})
+            timing_info = {"ttft": timing.ttft, "total": timing.total, "source": timing.source}
+            st.caption(format_timing(timing_info))
         
+        st.session_state.messages.append({"role": "assistant", "content": response, "timing": timing_info})
         st.session_state.processing = False
         st.rerun()
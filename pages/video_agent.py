@@ -1,7 +1,7 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import asyncio
-from services.anam_service import anam_service
+from services.anam_service import anam_service, VIDEO_AGENT_PERSONA
+from services.session_token_pool import session_token_pool
 
 # Initialize session state for Anam
 if "anam_session_token" not in st.session_state:
@@ -9,24 +9,15 @@ if "anam_session_token" not in st.session_state:
 if "anam_session_id" not in st.session_state:
     st.session_state.anam_session_id = "default-session"
 
-# Create session token if needed
+# Take a session token if needed (pre-minted by the token pool, minted on demand on a miss)
 if st.session_state.anam_session_token is None:
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    result = session_token_pool.acquire(anam_service.build_persona_payload(**VIDEO_AGENT_PERSONA))
     
-    session_data = loop.run_until_complete(
-        anam_service.create_session_token(
-            persona_name="Samantha",
-            system_prompt="You are Samantha, a helpful AI assistant.",
-            llm_id="CUSTOMER_CLIENT_V1"
-        )
-    )
-    
-    if not session_data or "sessionToken" not in session_data:
-        st.error("Failed to create Anam session. Check your ANAM_API_KEY in .env")
+    if not result.ok:
+        st.error(f"Failed to create Anam session ({result.message}). Check your ANAM_API_KEY in .env")
         st.stop()
     
-    st.session_state.anam_session_token = session_data["sessionToken"]
+    st.session_state.anam_session_token = result.session_token
 
 session_token = st.session_state.anam_session_token
 session_id = st.session_state.anam_session_id
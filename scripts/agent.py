@@ -1,51 +1,26 @@
 import os
+import time
+import threading
+from typing import Any, List, Optional
 from dotenv import load_dotenv
 from loguru import logger
-from langchain_cerebras import ChatCerebras
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.prebuilt import create_react_agent
-
-# Import tools from the new tools package
-from tools.tavily_tool import tavily_tool
-from tools.stock_tools import get_stock_price, get_company_info
-from tools.weather_tool import get_weather
-from tools.flight_tool import search_flights
-from tools.hotel_tool import search_hotels
-from tools.database_tool import database_search
 
 
 load_dotenv()
 
-# ==========================
-# 1. LLM MODEL (CEREBRAS)
-# ==========================
-model = ChatCerebras(
-    model="gpt-oss-120b",      # Low latency, strong model
-    max_tokens=512,
-    api_key=os.getenv("CEREBRAS_API_KEY"),
-    temperature=0.7,
-)
-
-# ==========================
-# 2. REGISTER ALL TOOLS
-# ==========================
-tools = [
-    tavily_tool,
-    get_stock_price,
-    get_company_info,
-    get_weather,
-    search_flights,
-    search_hotels,
-    database_search,
-]
+# Importing this module is cheap: the model client, the tool modules (yfinance,
+# Firecrawl, Tavily, Chroma, ...) and the graph are only loaded when the agent
+# is first needed. Call get_agent() at use time, or warm_agent() at startup to
+# build it in the background. `from scripts.agent import agent` still works and
+# builds the agent on access.
 
 # ==========================
-# 3. SYSTEM PROMPT
+# 1. SYSTEM PROMPT
 # ==========================
 system_prompt = """
 You are Samantha, a helpful AI agent.
 Use TavilySearch for general or current information.
-Use YFinance tools for stock prices and company financials.
+Use YFinance tools for stock prices and company financials (get_stock_prices for several tickers at once).
 Use Weather tool for current weather.
 Use Flights tool for flight options by Scraping Kayak for flight options via Firecrawl.
 Use Hotels tool for hotel options by Scraping Kayak for hotel options via Firecrawl.
@@ -53,25 +28,162 @@ Use Database tool for questions about uploaded documents, manuals, or specific i
 Keep responses short, natural, and suitable for voice interaction.
 """
 
+# ==========================
+# 2. LLM MODEL (CEREBRAS)
+# ==========================
+def create_model():
+    from langchain_cerebras import ChatCerebras
+
+    return ChatCerebras(
+        model="gpt-oss-120b",      # Low latency, strong model
+        max_tokens=512,
+        api_key=os.getenv("CEREBRAS_API_KEY"),
+        temperature=0.7,
+    )
+
+# ==========================
+# 3. REGISTER ALL TOOLS
+# ==========================
+def load_tools() -> List[Any]:
+    """Import the tool modules (their caches register with the tool metrics on import)."""
+    from tools.tavily_tool import tavily_tool
+    from tools.stock_tools import get_stock_price, get_stock_prices, get_company_info
+    from tools.weather_tool import get_weather
+    from tools.flight_tool import search_flights
+    from tools.hotel_tool import search_hotels
+    from tools.database_tool import database_search
+
+    return [
+        tavily_tool,
+        get_stock_price,
+        get_stock_prices,
+        get_company_info,
+        get_weather,
+        search_flights,
+        search_hotels,
+        database_search,
+    ]
+
+
+def create_tool_node(tools: List[Any]):
+    from langgraph.prebuilt import ToolNode
+    from services.tool_executor import tool_executor
+
+    # Tool calls requested in the same step run concurrently, each with its own timeout
+    # and a shared per-turn latency budget; latency/outcome stats are kept per tool
+    return ToolNode(
+        tools,
+        wrap_tool_call=tool_executor.wrap,
+        awrap_tool_call=tool_executor.awrap,
+    )
+
 # ==========================
 # 4. MEMORY
 # ==========================
-memory = InMemorySaver()
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_memory():
+    """
+    The shared conversation checkpointer.
+    SQLite-backed with idle-thread TTL, thread cap and per-thread compaction
+    (set CHECKPOINTER=memory for the old in-process saver).
+    """
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                from services.checkpointer import create_checkpointer
+
+                _memory = create_checkpointer()
+    return _memory
 
 # ==========================
 # 5. BUILD THE AGENT
 # ==========================
-# pyrefly: ignore [deprecated]
-agent = create_react_agent(
-    model=model,
-    tools=tools,
-    prompt=system_prompt,
-    checkpointer=memory,
-)
+def build_agent(model: Any = None, tools: Optional[List[Any]] = None, checkpointer: Any = None):
+    """Build a new agent; defaults to the Cerebras model, all tools and the shared checkpointer."""
+    from langgraph.prebuilt import create_react_agent
+    from services.context_window import ContextState, ContextWindow
+
+    model = model if model is not None else create_model()
+    tools = tools if tools is not None else load_tools()
+
+    # Keeps each prompt within CONTEXT_TOKEN_BUDGET; older turns become a cached running summary
+    context_window = ContextWindow(summary_model=model, system_prompt=system_prompt)
+
+    # pyrefly: ignore [deprecated]
+    return create_react_agent(
+        model=model,
+        tools=create_tool_node(tools) if tools else [],
+        prompt=system_prompt,
+        checkpointer=checkpointer if checkpointer is not None else get_memory(),
+        state_schema=ContextState,
+        pre_model_hook=context_window.as_runnable(),
+    )
+
+
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_agent():
+    """The shared agent, built on first use (thread-safe)."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                start = time.perf_counter()
+                _agent = build_agent()
+                logger.info(f"🤖 Agent ready in {time.perf_counter() - start:.2f}s")
+    return _agent
+
+
+def agent_ready() -> bool:
+    return _agent is not None
+
+
+def set_agent(agent: Any) -> None:
+    """Replace the shared agent (load tests, fake models)."""
+    global _agent
+    with _agent_lock:
+        _agent = agent
+
+
+def warm_agent() -> threading.Thread:
+    """Build the shared agent on a background thread so startup is not blocked by it."""
+
+    def build():
+        try:
+            get_agent()
+        except Exception as e:
+            logger.error(f"Agent warm-up failed: {e}")
+
+    thread = threading.Thread(target=build, name="agent-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards-compatible lazy attributes: `from scripts.agent import agent, memory`
+    if name == "agent":
+        return get_agent()
+    if name == "memory":
+        return get_memory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Config
-agent_config = {
-    "configurable": {
-        "thread_id": "default_user"
+def build_agent_config(thread_id: str = "default_user") -> dict:
+    """
+    Build a fresh run config for one conversation thread.
+    Always use this per request instead of copying a shared dict: the nested
+    "configurable" dict would otherwise be shared across concurrent requests.
+    """
+    return {
+        "configurable": {
+            "thread_id": thread_id
+        }
     }
-}
+
+agent_config = build_agent_config()
@@ -0,0 +1,144 @@
+"""
+Local stub of Anam's session-token API, with a latency benchmark for AnamService.
+
+Serves POST /v1/auth/session-token on localhost (real sockets via uvicorn, so
+connection setup costs are measured) and compares a fresh httpx client per
+request (the old behaviour) with the service's pooled keep-alive client.
+Use --fail-rate to watch the jittered retries recover from 503s.
+
+Usage:
+    python -m scripts.anam_stub_server --serve --port 8787
+    python -m scripts.anam_stub_server --requests 200 --latency 0.005
+    python -m scripts.anam_stub_server --requests 100 --fail-rate 0.3
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from typing import List
+
+# config.settings requires an API key at import time; the stub accepts any key
+os.environ.setdefault("ANAM_API_KEY", "stub-key")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+
+from services.anam_service import AnamService
+
+
+def create_stub_app(latency: float = 0.0, fail_rate: float = 0.0, token_ttl: int = 300) -> FastAPI:
+    """Stand-in for the Anam API: issues random session tokens, optionally slow or flaky."""
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.post("/v1/auth/session-token")
+    async def session_token(request: Request, authorization: str = Header("")):
+        app.state.requests += 1
+        if not authorization.startswith("Bearer "):
+            return JSONResponse({"error": "missing bearer token"}, status_code=401)
+        body = await request.json()
+        if "personaConfig" not in body:
+            return JSONResponse({"error": "personaConfig required"}, status_code=400)
+        if latency:
+            await asyncio.sleep(latency)
+        if fail_rate and random.random() < fail_rate:
+            return JSONResponse({"error": "temporarily unavailable"}, status_code=503)
+        return {"sessionToken": f"stub-{uuid.uuid4().hex}", "expiresIn": token_ttl}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_in_thread(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def report(label: str, latencies: List[float], failures: int = 0, extra: str = "") -> None:
+    print(
+        f"{label:<22} mean={sum(latencies) / len(latencies) * 1000:7.2f}ms "
+        f"p50={percentile(latencies, 50) * 1000:7.2f}ms p99={percentile(latencies, 99) * 1000:7.2f}ms "
+        f"failures={failures}{extra}"
+    )
+
+
+async def benchmark(base_url: str, requests: int) -> None:
+    service = AnamService(api_key="stub-key", base_url=base_url)
+    payload = service.build_persona_payload()
+
+    # Old behaviour: a new client (new TCP connection) per token
+    latencies, failures = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{base_url}/v1/auth/session-token", headers=service.headers, json=payload, timeout=30.0
+            )
+        latencies.append(time.perf_counter() - start)
+        failures += response.status_code >= 400
+    report("client per request", latencies, failures)
+
+    # Pooled keep-alive client with retries and structured results
+    latencies, failures, attempts = [], 0, 0
+    for _ in range(requests):
+        result = await service.request_session_token(payload)
+        latencies.append(result.latency)
+        failures += not result.ok
+        attempts += result.attempts
+    report("pooled client", latencies, failures, f" attempts={attempts} http={result.http_version}")
+
+    # Concurrent burst on the pool
+    start = time.perf_counter()
+    results = await asyncio.gather(*(service.request_session_token(payload) for _ in range(requests)))
+    wall = time.perf_counter() - start
+    report("pooled, concurrent", [r.latency for r in results], sum(not r.ok for r in results), f" wall={wall * 1000:.0f}ms")
+    await service.aclose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--serve", action="store_true", help="only run the stub server")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="server-side delay per token (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    app = create_stub_app(latency=args.latency, fail_rate=args.fail_rate)
+    if args.serve:
+        uvicorn.run(app, host="127.0.0.1", port=args.port or 8787, log_level="info")
+        return 0
+
+    port = args.port or free_port()
+    server = serve_in_thread(app, port)
+    try:
+        asyncio.run(benchmark(f"http://127.0.0.1:{port}", args.requests))
+    finally:
+        server.should_exit = True
+    print(f"Stub served {app.state.requests} requests")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
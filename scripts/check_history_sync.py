@@ -0,0 +1,238 @@
+"""
+Checks that delta history mode keeps threads and prompts linear, retries included.
+
+1. ``select_new_messages`` alone: a client that resends its whole history every
+   turn (as Anam and the Streamlit chat page do) against a fake checkpointed
+   thread. Each turn must append exactly one message (the new user turn);
+   retried requests must append nothing.
+2. The ``/llm/stream`` endpoint (``--endpoint``, on by default) with the agent
+   replaced by a fake model over an in-memory checkpointer. For turn t the
+   thread must hold 2(t+1) messages and the model's prompt 2t+1; a retry after
+   the reply was stored must replay it without calling the model, and a retry
+   after a failed model call must call it once more on the same prompt.
+
+No model API, tool API or external service is needed.
+
+Usage:
+    python -m scripts.check_history_sync
+    python -m scripts.check_history_sync --turns 500 --window 12 --no-endpoint
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from services.history_sync import select_new_messages
+
+
+@dataclass
+class FakeMessage:
+    """Stand-in for a LangChain message: only ``type`` and ``content`` are read."""
+
+    type: str
+    content: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def store(thread: List[FakeMessage], messages: List[Dict[str, str]]) -> None:
+    """Append input messages the way the checkpointer's add_messages reducer would."""
+    for message in messages:
+        thread.append(FakeMessage("human" if message["role"] == "user" else "ai", message["content"]))
+
+
+def reply(thread: List[FakeMessage], turn: int) -> str:
+    """The agent's answer, stored in tool-call-expanded form as create_react_agent does."""
+    text = f"answer {turn}"
+    thread.append(FakeMessage("ai", "", tool_calls=[{"name": "get_weather", "args": {}, "id": f"call-{turn}"}]))
+    thread.append(FakeMessage("tool", f"tool result {turn}"))
+    thread.append(FakeMessage("ai", text))
+    return text
+
+
+def run(turns: int, window: int, retry_every: int) -> List[str]:
+    """Drive ``turns`` turns and return a list of failures (empty when all checks pass)."""
+    failures: List[str] = []
+    thread: List[FakeMessage] = []
+    history: List[Dict[str, str]] = []
+
+    def sent() -> List[Dict[str, str]]:
+        # A client may only keep the last ``window`` messages
+        return history[-window:] if window else list(history)
+
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"question {turn}"})
+        delta = select_new_messages(sent(), thread)
+        if [m["content"] for m in delta] != [f"question {turn}"]:
+            failures.append(f"turn {turn}: appended {len(delta)} messages {delta!r}, expected the new user turn")
+        store(thread, delta)
+
+        if retry_every and turn % retry_every == 0:
+            # Retry before the reply: the first attempt stored the user turn and then failed
+            delta = select_new_messages(sent(), thread)
+            if delta:
+                failures.append(f"turn {turn}: retry before the reply appended {delta!r}")
+            store(thread, delta)
+
+        answer = reply(thread, turn)
+
+        if retry_every and turn % retry_every == 1:
+            # Retry after the reply: the answer was stored but never reached the client
+            delta = select_new_messages(sent(), thread)
+            if delta:
+                failures.append(f"turn {turn}: retry after the reply appended {delta!r}")
+            store(thread, delta)
+
+        history.append({"role": "assistant", "content": answer})
+
+    stored_users = sum(1 for m in thread if m.type == "human")
+    if stored_users != turns:
+        failures.append(f"thread holds {stored_users} user messages after {turns} turns")
+    return failures
+
+
+# ----------------------------- endpoint -----------------------------
+
+
+def build_fake_agent(prompts: List[int], fail_once: set):
+    """create_react_agent over a fake model that records each prompt's size and can fail a turn once."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.prebuilt import create_react_agent
+
+    class NumberedAnswerModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "numbered-answer"
+
+        def bind_tools(self, tools: Any, **kwargs: Any) -> "NumberedAnswerModel":
+            return self
+
+        def _reply(self, messages) -> str:
+            prompts.append(len(messages))
+            question = messages[-1].content
+            if question in fail_once:
+                fail_once.discard(question)
+                raise RuntimeError(f"model failed on {question!r}")
+            return question.replace("question", "answer")
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=self._reply(messages)))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    return create_react_agent(model=NumberedAnswerModel(), tools=[], checkpointer=InMemorySaver())
+
+
+async def run_endpoint(turns: int, retry_every: int) -> List[str]:
+    """Drive /llm/stream for ``turns`` turns; returns failures."""
+    import httpx
+
+    # The real model/tool clients read their keys at construction; nothing is called here
+    for key in ("CEREBRAS_API_KEY", "TAVILY_API_KEY", "ANAM_API_KEY"):
+        os.environ.setdefault(key, "check")
+    import backend
+    from scripts.agent import build_agent_config, set_agent
+
+    # backend configures its own handlers on import; keep the output to the summary
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    prompts: List[int] = []
+    fail_once: set = set()
+    agent = build_fake_agent(prompts, fail_once)
+    set_agent(agent)
+    config = build_agent_config("history-check")
+    failures: List[str] = []
+    history: List[Dict[str, str]] = []
+
+    async def post(client) -> str:
+        reply = ""
+        async with client.stream(
+            "POST", "/llm/stream", params={"session_id": "history-check", "tts": "false"}, json={"messages": history}
+        ) as response:
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    reply += json.loads(line[6:])["content"]
+        return reply
+
+    async def thread_length() -> int:
+        return len((await agent.aget_state(config)).values.get("messages", []))
+
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://history-check", timeout=30) as client:
+        for turn in range(turns):
+            question, answer = f"question {turn}", f"answer {turn}"
+            history.append({"role": "user", "content": question})
+            failing = bool(retry_every) and turn % retry_every == 5 % retry_every
+            if failing:
+                # The first attempt stores the user turn, then the model fails
+                fail_once.add(question)
+                await post(client)
+
+            calls = len(prompts)
+            reply = await post(client)
+            if reply != answer:
+                failures.append(f"turn {turn}: reply {reply!r}, expected {answer!r}")
+            if len(prompts) - calls != 1 or prompts[-1] != 2 * turn + 1:
+                failures.append(f"turn {turn}: prompt sizes {prompts[calls:]}, expected [{2 * turn + 1}]")
+
+            if retry_every and turn % retry_every == 1:
+                # Retry after the reply was stored but never reached the client
+                calls = len(prompts)
+                reply = await post(client)
+                if reply != answer or len(prompts) != calls:
+                    failures.append(f"turn {turn}: retry got {reply!r} with {len(prompts) - calls} model calls")
+
+            if await thread_length() != 2 * (turn + 1):
+                failures.append(f"turn {turn}: thread holds {await thread_length()} messages, expected {2 * (turn + 1)}")
+            history.append({"role": "assistant", "content": reply})
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--window", type=int, default=0, help="messages the client keeps (0 = all)")
+    parser.add_argument("--retry-every", type=int, default=10, help="retry the request every N turns (0 = never)")
+    parser.add_argument(
+        "--endpoint", action=argparse.BooleanOptionalAction, default=True, help="also drive /llm/stream with a fake model"
+    )
+    args = parser.parse_args()
+
+    # select_new_messages logs every retry; keep the output to the summary
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    failed = False
+    windows = [args.window] if args.window else [0, 12]
+    for window in windows:
+        failures = run(args.turns, window, args.retry_every)
+        label = f"window {window}" if window else "full history"
+        print(f"{label}: {args.turns} turns, {len(failures)} failures")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        failed = failed or bool(failures)
+
+    if args.endpoint:
+        failures = asyncio.run(run_endpoint(args.turns, args.retry_every))
+        print(f"/llm/stream: {args.turns} turns, {len(failures)} failures")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
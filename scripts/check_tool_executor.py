@@ -0,0 +1,126 @@
+"""
+Self-contained check of where the agent's tools actually run.
+
+Builds a create_react_agent over the real ToolNode wiring (scripts.agent.create_tool_node)
+with a fake model that requests a blocking ``@tool``, a native async tool and a
+blocking call with invalid arguments in one step. Asserts that:
+
+    - blocking tools run on the ToolExecutor's bounded pool ("tool_*" threads),
+      on both the async (astream_events/ainvoke) and the sync (invoke) path,
+      never on asyncio's default executor ("asyncio_*" threads)
+    - native async tools are awaited on the event loop thread
+    - invalid arguments still come back as an error ToolMessage (ToolNode's validation)
+
+No model API, tool API or backend is needed.
+
+Usage:
+    python -m scripts.check_tool_executor
+"""
+
+import sys
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from scripts.agent import create_tool_node
+
+# tool name -> thread names it ran on
+THREADS: Dict[str, List[str]] = {}
+
+
+@tool
+def blocking_lookup(x: int) -> str:
+    """A blocking tool, like the stock, scrape and database tools."""
+    THREADS.setdefault("blocking_lookup", []).append(threading.current_thread().name)
+    return f"blocking {x}"
+
+
+@tool
+async def async_lookup(x: int) -> str:
+    """A native async tool, like the weather tool."""
+    THREADS.setdefault("async_lookup", []).append(threading.current_thread().name)
+    return f"async {x}"
+
+
+class ToolCallingModel(BaseChatModel):
+    """Fake chat model: requests the configured tool calls once, then answers."""
+
+    calls: List[Dict[str, Any]]
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-calling"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ToolCallingModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if messages[-1].type == "human":
+            message = AIMessage(content="", tool_calls=self.calls)
+        else:
+            message = AIMessage(content="done")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def build(calls: List[Dict[str, Any]]):
+    return create_react_agent(
+        model=ToolCallingModel(calls=calls),
+        tools=create_tool_node([blocking_lookup, async_lookup]),
+        checkpointer=InMemorySaver(),
+    )
+
+
+def check_tool_messages(messages: List[BaseMessage], failures: List[str], path: str) -> None:
+    results = {m.tool_call_id: m for m in messages if m.type == "tool"}
+    if results.get("ok") is None or results["ok"].content != "blocking 1":
+        failures.append(f"{path}: blocking tool result missing or wrong")
+    invalid = results.get("invalid")
+    if invalid is None or invalid.status != "error":
+        failures.append(f"{path}: invalid arguments did not produce an error ToolMessage")
+
+
+def main() -> int:
+    failures: List[str] = []
+    config = {"configurable": {"thread_id": "check"}}
+    question = {"messages": [{"role": "user", "content": "go"}]}
+    blocking_calls = [
+        {"name": "blocking_lookup", "args": {"x": 1}, "id": "ok"},
+        {"name": "blocking_lookup", "args": {"x": "not a number"}, "id": "invalid"},
+    ]
+
+    # Async path (backend.py, app.py): both tools in one step
+    result = asyncio.run(
+        build(blocking_calls + [{"name": "async_lookup", "args": {"x": 2}, "id": "async"}]).ainvoke(question, config)
+    )
+    async_threads = dict(THREADS)
+    check_tool_messages(result["messages"], failures, "async")
+    if not all(name.startswith("tool") for name in async_threads.get("blocking_lookup", [])):
+        failures.append(f"async: blocking tool ran on {async_threads.get('blocking_lookup')}, not the tool pool")
+    if async_threads.get("async_lookup") != ["MainThread"]:
+        failures.append(f"async: async tool ran on {async_threads.get('async_lookup')}, not the loop thread")
+
+    # Sync path (agent.invoke)
+    THREADS.clear()
+    result = build(blocking_calls).invoke(question, config)
+    sync_threads = dict(THREADS)
+    check_tool_messages(result["messages"], failures, "sync")
+    if not all(name.startswith("tool") for name in sync_threads.get("blocking_lookup", [])):
+        failures.append(f"sync: blocking tool ran on {sync_threads.get('blocking_lookup')}, not the tool pool")
+
+    print(f"async path threads: {async_threads}")
+    print(f"sync path threads:  {sync_threads}")
+    print(f"{len(failures)} failures")
+    for failure in failures:
+        print(f"  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Import-time profile and startup-time targets for each entry point.
+
+Runs every entry point's imports in a fresh interpreter with ``-X importtime``
+and reports the total, the heaviest top-level packages (self time, summed per
+package) and the heaviest individual imports (cumulative). The deferred agent
+build is profiled as its own entry so its cost stays visible after moving off
+the import path.
+
+Usage:
+    python -m scripts.import_profile
+    python -m scripts.import_profile --entry backend --top 20
+    python -m scripts.import_profile --check        # exit 1 if any target is missed
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# The real model/tool clients read their keys at construction; nothing is called here
+PROFILE_ENV = {"CEREBRAS_API_KEY": "profile", "TAVILY_API_KEY": "profile", "ANAM_API_KEY": "profile"}
+
+# name -> (code run in a fresh interpreter, import-time target in ms)
+# Targets are for a warm disk cache; rerun with --repeat to smooth out noise.
+ENTRY_POINTS: Dict[str, Tuple[str, float]] = {
+    # FastAPI backend for Anam: serves /health before the agent is built
+    "backend": ("import backend", 800),
+    # FastRTC voice app (gradio/fastrtc/cartesia dominate; the agent builds in the background)
+    "voice app": ("import app", 4000),
+    # Streamlit main script: Anam service and token pool
+    "streamlit main": ("import services.anam_service, services.session_token_pool", 500),
+    # Streamlit chat page: SSE client only, no agent
+    "chat page": ("import services.llm_stream_client", 400),
+    # The agent module itself (cheap now that construction is deferred)
+    "agent module": ("import scripts.agent", 250),
+    # Deferred work: model client, tool modules and graph, paid once in the background
+    "agent build": ("import scripts.agent as a; a.get_agent()", 3000),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+@dataclass
+class ImportProfile:
+    name: str
+    total_ms: float = 0.0
+    wall_ms: float = 0.0
+    packages: Dict[str, float] = field(default_factory=dict)  # top-level package -> self ms
+    imports: List[Tuple[float, str]] = field(default_factory=list)  # (cumulative ms, module)
+    error: Optional[str] = None
+
+
+def profile(name: str, code: str) -> ImportProfile:
+    env = {**PROFILE_ENV, **os.environ}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+        capture_output=True, text=True, env=env,
+    )
+    result = ImportProfile(name=name, wall_ms=(time.perf_counter() - start) * 1000)
+
+    packages: Dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        packages[module.split(".")[0]] += self_us / 1000
+        result.imports.append((cumulative_us / 1000, module))
+        if len(indent) <= 1:  # top-level import of this run
+            result.total_ms += cumulative_us / 1000
+    result.packages = dict(packages)
+
+    if proc.returncode != 0:
+        result.error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+    return result
+
+
+def report(result: ImportProfile, target_ms: float, top: int) -> bool:
+    if result.error:
+        print(f"\n{result.name}: SKIPPED ({result.error})")
+        return True
+    ok = result.total_ms <= target_ms
+    print(
+        f"\n{result.name}: imports {result.total_ms:.0f} ms (target {target_ms:.0f} ms) "
+        f"-> {'OK' if ok else 'OVER'}; process wall {result.wall_ms:.0f} ms"
+    )
+    print("  heaviest packages (self time):")
+    for package, ms in sorted(result.packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {ms:8.1f} ms  {package}")
+    print("  heaviest imports (cumulative):")
+    for ms, module in sorted(result.imports, reverse=True)[:top]:
+        print(f"    {ms:8.1f} ms  {module}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entry", action="append", choices=list(ENTRY_POINTS), help="profile only these entry points")
+    parser.add_argument("--top", type=int, default=8, help="rows per breakdown")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per entry point; the fastest is reported")
+    parser.add_argument("--check", action="store_true", help="exit 1 if an entry point misses its target")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.entry or ENTRY_POINTS:
+        code, target_ms = ENTRY_POINTS[name]
+        runs = [profile(name, code) for _ in range(max(1, args.repeat))]
+        best = min(runs, key=lambda r: (r.error is not None, r.total_ms))
+        results.append((best, target_ms, report(best, target_ms, args.top)))
+
+    print("\nSummary:")
+    for result, target_ms, ok in results:
+        status = "SKIPPED" if result.error else ("OK" if ok else "OVER")
+        print(f"  {result.name:<16} {result.total_ms:8.0f} ms / {target_ms:6.0f} ms  {status}")
+    return 1 if args.check and not all(ok for _, _, ok in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Concurrency harness for the /llm/stream endpoint.
+
+Fires many parallel multi-turn sessions at the FastAPI backend (in-process,
+via httpx's ASGI transport) with the agent's LLM replaced by a fake model
+that echoes the session markers of every user message it sees. Any reply that mentions another
+session's messages means histories crossed threads.
+
+The fake model also records how many messages each prompt carried. With the
+backend's delta history mode the prompt for turn t must hold at most the
+system prompt plus t+1 user and t assistant messages, i.e. grow linearly.
+
+Usage:
+    python -m scripts.load_test_llm_stream --sessions 300 --turns 3
+    python -m scripts.load_test_llm_stream --sessions 20 --turns 100
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+# The real model/tool clients are constructed at import time; they are never called here
+for key in ("CEREBRAS_API_KEY", "TAVILY_API_KEY", "ANAM_API_KEY"):
+    os.environ.setdefault(key, "load-test")
+os.environ.setdefault("CHECKPOINT_DB_PATH", os.path.join(tempfile.mkdtemp(), "load_test.db"))
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.prebuilt import create_react_agent
+
+import backend
+from scripts.agent import get_memory, set_agent, system_prompt
+
+MARKER = re.compile(r"s(\d+)-t(\d+)")
+
+# (session, turn) -> number of messages in the prompt the model received
+PROMPT_SIZES: Dict[Tuple[int, int], int] = {}
+
+
+class EchoSessionModel(BaseChatModel):
+    """Fake chat model that streams back the session markers in its prompt, word by word."""
+
+    token_delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo-session"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "EchoSessionModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        # Latest marker per session found in the prompt's user messages (constant-size reply)
+        latest: Dict[str, str] = {}
+        for m in messages:
+            if m.type == "human":
+                for session, turn in MARKER.findall(m.content):
+                    latest[session] = f"s{session}-t{turn}"
+        if messages and messages[-1].type == "human":
+            markers = MARKER.findall(messages[-1].content)
+            if markers:
+                session, turn = markers[-1]
+                PROMPT_SIZES[(int(session), int(turn))] = len(messages)
+        return "seen " + " ".join(latest.values())
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for word in self._reply(messages).split(" "):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def run_session(client: httpx.AsyncClient, session: int, turns: int, results: dict) -> None:
+    history = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"s{session}-t{turn}"})
+        start = time.perf_counter()
+        first_byte: Optional[float] = None
+        reply = ""
+        async with client.stream(
+            "POST",
+            "/llm/stream",
+            params={"session_id": f"load-{session}"},
+            json={"messages": history},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                reply += json.loads(line[6:])["content"]
+        results["latencies"].append(time.perf_counter() - start)
+        results["ttfb"].append(first_byte or 0.0)
+
+        foreign = {int(s) for s, _ in MARKER.findall(reply)} - {session}
+        if foreign or f"s{session}-t{turn}" not in reply:
+            results["violations"].append((session, turn, reply.strip()[:200]))
+        history.append({"role": "assistant", "content": reply.strip()})
+
+
+async def main(sessions: int, turns: int, token_delay: float) -> int:
+    set_agent(create_react_agent(
+        model=EchoSessionModel(token_delay=token_delay),
+        tools=[],
+        prompt=system_prompt,
+        checkpointer=get_memory(),
+    ))
+
+    results = {"latencies": [], "ttfb": [], "violations": []}
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_session(client, s, turns, results) for s in range(sessions)))
+        wall = time.perf_counter() - start
+
+    requests = len(results["latencies"])
+    print(f"Sessions: {sessions} x {turns} turns = {requests} requests in {wall:.2f}s")
+    print(f"Throughput: {requests / wall:.1f} req/s")
+    print(
+        f"Latency: p50={percentile(results['latencies'], 50) * 1000:.1f}ms "
+        f"p99={percentile(results['latencies'], 99) * 1000:.1f}ms"
+    )
+    print(
+        f"First chunk: p50={percentile(results['ttfb'], 50) * 1000:.1f}ms "
+        f"p99={percentile(results['ttfb'], 99) * 1000:.1f}ms"
+    )
+    print(f"Cross-session violations: {len(results['violations'])}")
+    for session, turn, reply in results["violations"][:5]:
+        print(f"  session {session} turn {turn}: {reply}")
+
+    # System prompt + (turn + 1) user messages + turn assistant replies
+    oversized = {key: size for key, size in PROMPT_SIZES.items() if size > 2 * key[1] + 2}
+    last_turn = [size for (_, turn), size in PROMPT_SIZES.items() if turn == turns - 1]
+    print(
+        f"Prompt messages at turn {turns}: max {max(last_turn, default=0)} "
+        f"(linear bound {2 * (turns - 1) + 2}), over bound: {len(oversized)}"
+    )
+    return 1 if results["violations"] or oversized else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--token-delay", type=float, default=0.001)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.sessions, args.turns, args.token_delay)))
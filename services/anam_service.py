@@ -1,19 +1,215 @@
+import os
+import time
+import random
+import asyncio
+import weakref
 import httpx
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
+from loguru import logger
 from config.settings import settings
+from services.async_runner import background_loop, drop_closed_loops
+
+# Configuration
+ANAM_TIMEOUT_SECONDS = float(os.getenv("ANAM_TIMEOUT_SECONDS", "10"))
+ANAM_MAX_ATTEMPTS = int(os.getenv("ANAM_MAX_ATTEMPTS", "3"))
+ANAM_BACKOFF_BASE_SECONDS = 0.2
+ANAM_BACKOFF_MAX_SECONDS = 2.0
+POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=120)
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Persona of the Streamlit video agent page (also pre-warmed in the token pool by main.py)
+VIDEO_AGENT_PERSONA = {
+    "persona_name": "Samantha",
+    "system_prompt": "You are Samantha, a helpful AI assistant.",
+    "llm_id": "CUSTOMER_CLIENT_V1",
+}
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class SessionTokenResult:
+    """Outcome of a session-token request; ``error`` is None on success."""
+
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None  # "disabled", "http", "network", "timeout" or "invalid_response"
+    message: str = ""
+    status_code: Optional[int] = None
+    attempts: int = 0
+    latency: float = 0.0
+    http_version: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def session_token(self) -> Optional[str]:
+        return (self.data or {}).get("sessionToken")
+
+
+def backoff_delay(attempt: int, base: float = ANAM_BACKOFF_BASE_SECONDS, cap: float = ANAM_BACKOFF_MAX_SECONDS) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
 
 class AnamService:
     """Service for interacting with Anam AI API."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = ANAM_TIMEOUT_SECONDS,
+        max_attempts: int = ANAM_MAX_ATTEMPTS,
+        http2: bool = HTTP2_AVAILABLE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """Initialize Anam AI service."""
-        self.api_key = settings.anam_api_key
-        self.base_url = settings.anam_api_base_url
+        self.api_key = api_key if api_key is not None else settings.anam_api_key
+        self.base_url = base_url or settings.anam_api_base_url
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
         self.enabled = bool(self.api_key)
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.http2 = http2
+        self._transport = transport
+        # One pooled keep-alive client per event loop (httpx clients cannot be shared across loops)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            drop_closed_loops(self._clients)
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=POOL_LIMITS,
+                http2=self.http2,
+                transport=self._transport,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the current loop's pooled client."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    @staticmethod
+    def build_persona_payload(
+        persona_name: str = "Samantha",
+        system_prompt: Optional[str] = None,
+        avatar_id: Optional[str] = None,
+        voice_id: Optional[str] = None,
+        llm_id: Optional[str] = None,
+        max_session_length_seconds: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        # Use defaults from settings if not provided
+        avatar_id = avatar_id or settings.anam_avatar_id
+        voice_id = voice_id or settings.anam_voice_id
+
+        if llm_id is None:
+            llm_id = "CUSTOMER_CLIENT_V1"  # This tells Anam to use client-side/custom LLM
+
+        # Default system prompt (though for custom LLM, Anam might not use it directly, 
+        # it's good practice to set it)
+        if not system_prompt:
+            system_prompt = (
+                f"You are {persona_name}, a helpful AI assistant."
+            )
+
+        payload = {
+            "personaConfig": {
+                "name": persona_name,
+                "avatarId": avatar_id,
+                "voiceId": voice_id,
+                "llmId": llm_id,
+                "systemPrompt": system_prompt,
+            }
+        }
+
+        if max_session_length_seconds:
+            payload["personaConfig"]["maxSessionLengthSeconds"] = max_session_length_seconds
+
+        return payload
+
+    async def request_session_token(self, payload: Dict[str, Any]) -> SessionTokenResult:
+        """
+        POST a session-token request on the pooled client.
+        Retries network errors, timeouts, 429 and 5xx with jittered exponential
+        backoff (honouring Retry-After); other HTTP errors fail immediately.
+        """
+        start = time.perf_counter()
+        if not self.enabled:
+            return SessionTokenResult(error="disabled", message="ANAM_API_KEY is not set")
+
+        result = SessionTokenResult()
+        for attempt in range(self.max_attempts):
+            result.attempts = attempt + 1
+            retry_after = None
+            try:
+                response = await self._client().post("/v1/auth/session-token", json=payload)
+                result.status_code = response.status_code
+                result.http_version = response.http_version
+                if response.status_code < 400:
+                    result.data = response.json()
+                    if not result.session_token:
+                        result.error, result.message = "invalid_response", "No sessionToken in response"
+                    else:
+                        result.error, result.message = None, ""
+                    break
+                result.error = "http"
+                result.message = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    break
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TimeoutException as e:
+                result.error, result.message = "timeout", f"{type(e).__name__}: {e}"
+            except httpx.TransportError as e:
+                result.error, result.message = "network", f"{type(e).__name__}: {e}"
+            except ValueError as e:
+                result.error, result.message = "invalid_response", f"Response is not JSON: {e}"
+                break
+
+            if attempt + 1 < self.max_attempts:
+                delay = backoff_delay(attempt)
+                if retry_after and retry_after.isdigit():
+                    delay = min(float(retry_after), ANAM_BACKOFF_MAX_SECONDS * 5)
+                logger.warning(f"Anam session token attempt {attempt + 1} failed ({result.message}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        result.latency = time.perf_counter() - start
+        if not result.ok:
+            logger.error(f"Error creating session token after {result.attempts} attempt(s): {result.error} - {result.message}")
+        return result
+
+    async def create_session_token_result(
+        self,
+        persona_name: str = "Samantha",
+        system_prompt: Optional[str] = None,
+        avatar_id: Optional[str] = None,
+        voice_id: Optional[str] = None,
+        llm_id: Optional[str] = None,
+        max_session_length_seconds: Optional[int] = None,
+    ) -> SessionTokenResult:
+        """Create a session token for an Anam persona, with a structured result."""
+        payload = self.build_persona_payload(
+            persona_name, system_prompt, avatar_id, voice_id, llm_id, max_session_length_seconds
+        )
+        return await self.request_session_token(payload)
 
     async def create_session_token(
         self,
@@ -26,50 +222,33 @@ class AnamService:
     ) -> Optional[Dict[str, Any]]:
         """
         Create a session token for initializing an Anam persona.
+        Returns the response JSON, or None on failure (see create_session_token_result for details).
         """
-        if not self.enabled:
-            return None
-
-        try:
-            url = f"{self.base_url}/v1/auth/session-token"
-
-            # Use defaults from settings if not provided
-            avatar_id = avatar_id or settings.anam_avatar_id
-            voice_id = voice_id or settings.anam_voice_id
-
-            if llm_id is None:
-                llm_id = "CUSTOMER_CLIENT_V1"  # This tells Anam to use client-side/custom LLM
-
-            # Default system prompt (though for custom LLM, Anam might not use it directly, 
-            # it's good practice to set it)
-            if not system_prompt:
-                system_prompt = (
-                    f"You are {persona_name}, a helpful AI assistant."
-                )
-
-            payload = {
-                "personaConfig": {
-                    "name": persona_name,
-                    "avatarId": avatar_id,
-                    "voiceId": voice_id,
-                    "llmId": llm_id,
-                    "systemPrompt": system_prompt,
-                }
-            }
-
-            if max_session_length_seconds:
-                payload["personaConfig"]["maxSessionLengthSeconds"] = max_session_length_seconds
+        result = await self.create_session_token_result(
+            persona_name, system_prompt, avatar_id, voice_id, llm_id, max_session_length_seconds
+        )
+        return result.data if result.ok else None
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, headers=self.headers, json=payload, timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
-
-        except Exception as e:
-            print(f"Error creating session token: {e}")
-            return None
+    def create_session_token_sync(
+        self,
+        persona_name: str = "Samantha",
+        system_prompt: Optional[str] = None,
+        avatar_id: Optional[str] = None,
+        voice_id: Optional[str] = None,
+        llm_id: Optional[str] = None,
+        max_session_length_seconds: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> SessionTokenResult:
+        """
+        Blocking variant for sync callers such as Streamlit pages.
+        Runs on the process-wide background loop, so no event loop is created per call.
+        """
+        return background_loop.run(
+            self.create_session_token_result(
+                persona_name, system_prompt, avatar_id, voice_id, llm_id, max_session_length_seconds
+            ),
+            timeout,
+        )
 
 
 # Global service instance
@@ -0,0 +1,110 @@
+import asyncio
+import weakref
+import threading
+import concurrent.futures
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """
+    One long-lived event loop on a daemon thread, shared by the whole process.
+
+    Sync code (Streamlit pages, which rerun on a fresh script thread) calls
+    ``run(coro)`` instead of creating, and leaking, an event loop per rerun.
+    Because the loop never changes, per-loop resources such as the pooled
+    httpx clients of AnamService and WeatherClient are created once and reused.
+    Coroutines run under the caller's context variables.
+    """
+
+    def __init__(self, name: str = "background-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The shared loop, started on first use."""
+        loop = self._loop
+        if loop is not None:
+            return loop
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+                logger.debug(f"Started {self.name} event loop thread")
+            return self._loop
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule ``coro`` on the loop; returns a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run ``coro`` on the loop and block until it finishes (cancelled on timeout)."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}.run() called from its own loop thread; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        loop = self._loop
+        return {
+            "running": bool(loop and loop.is_running()),
+            "tasks": len(asyncio.all_tasks(loop)) if loop else 0,
+        }
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel pending tasks, stop the loop and close it."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+
+        async def shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not loop.is_running():
+                loop.close()
+
+
+def drop_closed_loops(per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]") -> None:
+    """
+    Forget per-loop resources (e.g. pooled clients) of loops that have been closed.
+    Their open connections reference the loop, which would otherwise keep both alive.
+    """
+    for loop in [loop for loop in list(per_loop.keys()) if loop.is_closed()]:
+        per_loop.pop(loop, None)
+
+
+# Global background loop
+background_loop = BackgroundLoop()
@@ -0,0 +1,104 @@
+import os
+from typing import Tuple
+import numpy as np
+
+# Configuration
+GATE_FRAME_MS = 20
+# A frame counts as speech when its RMS is above both floors (relative to the loudest frame, and absolute)
+GATE_RELATIVE_DB = float(os.getenv("STT_GATE_RELATIVE_DB", "-35"))
+GATE_ABSOLUTE_RMS = float(os.getenv("STT_GATE_ABSOLUTE_RMS", "0.005"))
+# Audio kept on either side of detected speech so word onsets/offsets are not clipped
+GATE_PADDING_MS = 150
+
+
+def to_mono_float(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert FastRTC audio (int16 or float, mono or multi-channel) to mono float32 in [-1, 1].
+
+    Multi-channel input is averaged across the channel axis, which is taken to
+    be the shorter dimension (FastRTC delivers ``(channels, samples)``).
+    """
+    if audio.ndim > 1:
+        channel_axis = int(np.argmin(audio.shape))
+        if audio.shape[channel_axis] == 1:
+            audio = audio.reshape(-1)
+        else:
+            audio = audio.mean(axis=channel_axis, dtype=np.float32)
+            if audio.dtype != np.float32:
+                audio = audio.astype(np.float32)
+
+    if np.issubdtype(audio.dtype, np.integer):
+        scale = float(np.iinfo(audio.dtype).max) + 1.0
+        samples = audio.astype(np.float32)
+        samples *= 1.0 / scale
+    else:
+        samples = audio.astype(np.float32, copy=False)
+
+    # In-place clipping; avoids int16 wrap-around on overdriven float input
+    np.clip(samples, -1.0, 1.0, out=samples)
+    return samples
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample mono float32 audio.
+
+    Integer down-sampling ratios (48k→16k, 32k→16k) average each block of
+    samples, which doubles as a cheap anti-aliasing filter. Other ratios use
+    linear interpolation.
+    """
+    if sample_rate == target_rate or samples.size == 0:
+        return samples
+
+    if sample_rate > target_rate and sample_rate % target_rate == 0:
+        factor = sample_rate // target_rate
+        usable = samples.size - samples.size % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1, dtype=np.float32)
+
+    duration = samples.size / sample_rate
+    target_size = max(1, int(round(duration * target_rate)))
+    positions = np.linspace(0, samples.size - 1, target_size, dtype=np.float64)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Drop leading/trailing frames whose RMS energy is below the gate."""
+    frame = max(1, sample_rate * GATE_FRAME_MS // 1000)
+    n_frames = samples.size // frame
+    if n_frames == 0:
+        return samples
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+    threshold = max(GATE_ABSOLUTE_RMS, float(rms.max()) * 10 ** (GATE_RELATIVE_DB / 20))
+
+    voiced = np.flatnonzero(rms >= threshold)
+    if voiced.size == 0:
+        return samples[:0]
+
+    pad = GATE_PADDING_MS // GATE_FRAME_MS
+    first = max(0, voiced[0] - pad) * frame
+    end_frame = voiced[-1] + 1 + pad
+    last = samples.size if end_frame >= n_frames else end_frame * frame
+    return samples[first:last]
+
+
+def preprocess_for_stt(audio: np.ndarray, sample_rate: int, target_rate: int) -> Tuple[np.ndarray, int]:
+    """
+    Prepare one FastRTC utterance for an STT engine.
+
+    Downmixes to mono, clips, resamples to the engine's native rate, trims
+    silence with an energy gate and converts to int16. The input array may be
+    modified in place.
+
+    Returns:
+        (int16 samples, sample rate). The array is empty when no speech was found.
+    """
+    samples = to_mono_float(audio)
+    samples = resample(samples, sample_rate, target_rate)
+    samples = trim_silence(samples, target_rate)
+
+    if not samples.flags.writeable:
+        samples = samples.copy()
+    samples *= 32767.0
+    return samples.astype(np.int16), target_rate
@@ -0,0 +1,240 @@
+import os
+import time
+import asyncio
+import sqlite3
+import resource
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from loguru import logger
+
+# Configuration
+CHECKPOINTER = os.getenv("CHECKPOINTER", "sqlite")  # "sqlite" or "memory"
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+THREAD_TTL_SECONDS = float(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", str(24 * 3600)))
+MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+MAX_CHECKPOINTS_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10"))
+MAINTENANCE_INTERVAL_SECONDS = 60.0
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """
+    SQLite checkpointer with idle-thread TTL eviction, a cap on stored threads
+    and per-thread compaction of old checkpoints.
+
+    Async methods run the sync implementation in a worker thread so one saver
+    serves both ``agent.invoke`` (Streamlit, FastRTC) and ``astream_events``
+    (FastAPI backend).
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        ttl_seconds: float = THREAD_TTL_SECONDS,
+        max_threads: int = MAX_THREADS,
+        max_checkpoints_per_thread: int = MAX_CHECKPOINTS_PER_THREAD,
+    ):
+        super().__init__(conn)
+        self.ttl_seconds = ttl_seconds
+        self.max_threads = max_threads
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self._last_maintenance = 0.0
+
+    @classmethod
+    def from_path(cls, path: str = CHECKPOINT_DB_PATH, **kwargs) -> "BoundedSqliteSaver":
+        conn = sqlite3.connect(path, check_same_thread=False)
+        return cls(conn, **kwargs)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        # Called by cursor() with self.lock already held
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_activity ("
+            "thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    # ----------------------------- writes + maintenance -----------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (thread_id, time.time()),
+            )
+        self.compact_thread(thread_id, configurable.get("checkpoint_ns", ""))
+        if time.monotonic() - self._last_maintenance > MAINTENANCE_INTERVAL_SECONDS:
+            self.evict()
+        return next_config
+
+    def compact_thread(self, thread_id: str, checkpoint_ns: str = "") -> int:
+        """Keep only the newest ``max_checkpoints_per_thread`` checkpoints of a thread."""
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+            )
+            stale = [(thread_id, checkpoint_ns, row[0]) for row in cur.fetchall()]
+            if stale:
+                cur.executemany(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    stale,
+                )
+                cur.executemany(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    stale,
+                )
+        return len(stale)
+
+    def evict(self) -> int:
+        """Delete threads idle longer than the TTL, then the least recently used beyond the cap."""
+        self._last_maintenance = time.monotonic()
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_seen < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            expired = [row[0] for row in cur.fetchall()]
+            cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_seen >= ? "
+                "ORDER BY last_seen DESC LIMIT -1 OFFSET ?",
+                (time.time() - self.ttl_seconds, self.max_threads),
+            )
+            over_cap = [row[0] for row in cur.fetchall()]
+
+        evicted = expired + over_cap
+        for thread_id in evicted:
+            self.delete_thread(thread_id)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} conversation threads ({len(expired)} idle, {len(over_cap)} over cap)")
+        return len(evicted)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def vacuum(self) -> None:
+        """Return freed pages to the filesystem after large evictions."""
+        with self.lock:
+            self.conn.execute("VACUUM")
+
+    # ----------------------------- reporting -----------------------------
+
+    def storage_report(self) -> Dict[str, Any]:
+        """Process resident memory, database file size and per-thread on-disk footprint."""
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                "SELECT thread_id, COUNT(*), SUM(LENGTH(checkpoint) + LENGTH(metadata)) "
+                "FROM checkpoints GROUP BY thread_id"
+            )
+            threads = {
+                row[0]: {"checkpoints": row[1], "disk_bytes": row[2] or 0, "writes": 0}
+                for row in cur.fetchall()
+            }
+            cur.execute("SELECT thread_id, COUNT(*), SUM(LENGTH(value)) FROM writes GROUP BY thread_id")
+            for thread_id, count, size in cur.fetchall():
+                entry = threads.setdefault(thread_id, {"checkpoints": 0, "disk_bytes": 0, "writes": 0})
+                entry["writes"] = count
+                entry["disk_bytes"] += size or 0
+            cur.execute("SELECT thread_id, last_seen FROM thread_activity")
+            for thread_id, last_seen in cur.fetchall():
+                if thread_id in threads:
+                    threads[thread_id]["idle_seconds"] = time.time() - last_seen
+
+        db_path = self._database_path()
+        db_bytes = 0
+        if db_path:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    db_bytes += os.path.getsize(db_path + suffix)
+
+        return {
+            "process_rss_bytes": process_rss_bytes(),
+            "db_file_bytes": db_bytes,
+            "thread_count": len(threads),
+            "threads": threads,
+        }
+
+    def _database_path(self) -> Optional[str]:
+        with self.lock:
+            rows = self.conn.execute("PRAGMA database_list").fetchall()
+        for _, name, path in rows:
+            if name == "main":
+                return path or None
+        return None
+
+    # ----------------------------- async bridge -----------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size (Linux), falling back to the peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def create_checkpointer(kind: str = CHECKPOINTER) -> BaseCheckpointSaver:
+    """Build the conversation checkpointer selected by ``CHECKPOINTER``."""
+    if kind == "memory":
+        return InMemorySaver()
+    if kind == "sqlite":
+        saver = BoundedSqliteSaver.from_path(CHECKPOINT_DB_PATH)
+        saver.evict()
+        return saver
+    raise ValueError(f"Unknown checkpointer '{kind}'. Choose 'sqlite' or 'memory'.")
@@ -0,0 +1,161 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from loguru import logger
+
+# Configuration
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "4000"))
+# When the budget is exceeded, slide the window down to this fraction of it so
+# the summary is only recomputed every few turns instead of on every turn
+CONTEXT_TARGET_RATIO = float(os.getenv("CONTEXT_TARGET_RATIO", "0.6"))
+SUMMARY_MAX_CHARS_PER_MESSAGE = 600
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a voice conversation between a user and "
+    "the assistant Samantha. Merge the existing summary with the new messages. "
+    "Keep names, numbers, dates, preferences and open questions. "
+    "Reply with the updated summary only, at most 150 words."
+)
+
+
+class ContextState(AgentState):
+    """Agent state plus the cached running summary of messages that left the window."""
+
+    context_summary: str
+    # ID of the first message still inside the window; everything before it is summarized
+    window_start_id: str
+
+
+class ContextWindow:
+    """
+    Pre-model hook that keeps the prompt within a token budget.
+
+    The full thread stays in the checkpointer. Only the model input is
+    trimmed: old turns are replaced by a cached running summary, which is
+    updated incrementally (previous summary + newly dropped messages) and only
+    when the window slides.
+    """
+
+    def __init__(
+        self,
+        summary_model: Any,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        target_ratio: float = CONTEXT_TARGET_RATIO,
+        system_prompt: str = "",
+    ):
+        self.summary_model = summary_model
+        self.token_budget = token_budget
+        self.target_tokens = int(token_budget * target_ratio)
+        # The agent's system prompt is prepended after this hook; reserve room for it
+        self.reserved_tokens = count_tokens_approximately([SystemMessage(system_prompt)]) if system_prompt else 0
+
+    def as_runnable(self) -> RunnableLambda:
+        return RunnableLambda(self.hook, afunc=self.ahook, name="context_window")
+
+    # ----------------------------- hook -----------------------------
+
+    def hook(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        plan = self._plan(state)
+        summary = state.get("context_summary", "")
+        if plan["dropped"]:
+            summary = self._summarize(summary, plan["dropped"])
+        return self._result(state, plan, summary)
+
+    async def ahook(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        plan = self._plan(state)
+        summary = state.get("context_summary", "")
+        if plan["dropped"]:
+            summary = await self._asummarize(summary, plan["dropped"])
+        return self._result(state, plan, summary)
+
+    # ----------------------------- window planning -----------------------------
+
+    def _plan(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[BaseMessage] = state["messages"]
+        summary = state.get("context_summary", "")
+        start = self._index_of(messages, state.get("window_start_id"))
+        window = messages[start:]
+
+        tokens = self._prompt_tokens(summary, window)
+        if tokens <= self.token_budget:
+            return {"start": start, "window": window, "dropped": [], "tokens": tokens}
+
+        # Slide forward, turn by turn, until under the target; never past the latest user turn
+        turn_starts = [i for i, m in enumerate(window) if isinstance(m, HumanMessage)]
+        cut = 0
+        for candidate in turn_starts:
+            if candidate == 0:
+                continue
+            cut = candidate
+            if self._prompt_tokens(summary, window[cut:]) <= self.target_tokens:
+                break
+
+        if cut == 0:
+            return {"start": start, "window": window, "dropped": [], "tokens": tokens}
+
+        return {
+            "start": start + cut,
+            "window": window[cut:],
+            "dropped": window[:cut],
+            "tokens": None,
+        }
+
+    def _result(self, state: Dict[str, Any], plan: Dict[str, Any], summary: str) -> Dict[str, Any]:
+        window = plan["window"]
+        llm_input = ([SystemMessage(f"Summary of the earlier conversation: {summary}")] if summary else []) + window
+        tokens = self.reserved_tokens + count_tokens_approximately(llm_input)
+        logger.info(
+            f"⚡ Context: prompt≈{tokens} tokens | window={len(window)} msgs | "
+            f"summarized={plan['start']} msgs{' (window slid)' if plan['dropped'] else ''}"
+        )
+
+        update: Dict[str, Any] = {"llm_input_messages": llm_input}
+        if plan["dropped"]:
+            update["context_summary"] = summary
+            update["window_start_id"] = window[0].id if window else ""
+        return update
+
+    def _prompt_tokens(self, summary: str, window: Sequence[BaseMessage]) -> int:
+        tokens = self.reserved_tokens + count_tokens_approximately(window)
+        if summary:
+            tokens += count_tokens_approximately([SystemMessage(summary)])
+        return tokens
+
+    @staticmethod
+    def _index_of(messages: Sequence[BaseMessage], message_id: Optional[str]) -> int:
+        if message_id:
+            for i, message in enumerate(messages):
+                if message.id == message_id:
+                    return i
+        return 0
+
+    # ----------------------------- summarization -----------------------------
+
+    def _summary_request(self, summary: str, dropped: Sequence[BaseMessage]) -> List[BaseMessage]:
+        lines = []
+        for message in dropped:
+            content = message.content if isinstance(message.content, str) else str(message.content)
+            if not content.strip():
+                continue
+            lines.append(f"{message.type}: {content[:SUMMARY_MAX_CHARS_PER_MESSAGE]}")
+        return [
+            SystemMessage(SUMMARY_INSTRUCTIONS),
+            HumanMessage(
+                f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n" + "\n".join(lines)
+            ),
+        ]
+
+    # Detached from the turn's callbacks so summary tokens never reach astream_events consumers (TTS)
+    _SUMMARY_CONFIG = {"callbacks": [], "run_name": "context_summary"}
+
+    def _summarize(self, summary: str, dropped: Sequence[BaseMessage]) -> str:
+        reply = self.summary_model.invoke(self._summary_request(summary, dropped), config=self._SUMMARY_CONFIG)
+        return str(reply.content).strip()
+
+    async def _asummarize(self, summary: str, dropped: Sequence[BaseMessage]) -> str:
+        reply = await self.summary_model.ainvoke(self._summary_request(summary, dropped), config=self._SUMMARY_CONFIG)
+        return str(reply.content).strip()
+
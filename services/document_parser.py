@@ -0,0 +1,45 @@
+from typing import Tuple
+
+# Parsing only: no Chroma, embedding or Streamlit imports. Spawned parse workers import
+# this module, so anything heavy added here is paid again by every worker process.
+
+# Configuration
+SUPPORTED_EXTENSIONS = ("pdf", "txt", "md")
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+
+def parse_file(path: str, source_name: str) -> Tuple[list, int]:
+    """
+    Load and split one file. Runs in the ingestion service's parse pool or inline.
+
+    Returns:
+        (chunks, page_count)
+    """
+    file_ext = source_name.split(".")[-1].lower()
+    if file_ext == "pdf":
+        from langchain_community.document_loaders.pdf import PyPDFLoader
+
+        loader = PyPDFLoader(path)
+    elif file_ext in ("txt", "md"):
+        from langchain_community.document_loaders.text import TextLoader
+
+        loader = TextLoader(path)
+    else:
+        raise ValueError("Unsupported file type. Only PDF, TXT, and MD are supported.")
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    docs = loader.load()
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        add_start_index=True,
+    )
+    chunks = text_splitter.split_documents(docs)
+
+    # Add metadata about source
+    for chunk in chunks:
+        chunk.metadata["source"] = source_name
+
+    return chunks, len(docs)
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional, Sequence
+from loguru import logger
+
+
+def _normalize(content: Any) -> str:
+    return " ".join(str(content).split())
+
+
+def _thread_user_texts(thread_messages: Sequence[Any]) -> List[str]:
+    return [_normalize(m.content) for m in thread_messages if getattr(m, "type", None) == "human"]
+
+
+def stored_reply(thread_messages: Sequence[Any]) -> Optional[str]:
+    """
+    The final reply already checkpointed for the thread's latest user turn, or None.
+
+    When ``select_new_messages`` returns nothing (a retried request) and the
+    thread ends with an assistant answer, the retry is served from the thread:
+    running the agent again would append a second reply to the same question.
+    A thread that ends with the user's message (or a pending tool call) has no
+    reply yet, and the agent should run.
+    """
+    if not thread_messages:
+        return None
+    last = thread_messages[-1]
+    if getattr(last, "type", None) != "ai" or getattr(last, "tool_calls", None):
+        return None
+    return last.content if isinstance(last.content, str) else _normalize(last.content)
+
+
+def select_new_messages(
+    client_messages: List[Dict[str, str]],
+    thread_messages: Sequence[Any],
+) -> List[Dict[str, str]]:
+    """
+    Reconcile a client-held history with a checkpointed thread and return only
+    the messages the thread has not seen yet.
+
+    Clients (Anam, the Streamlit chat page) resend their whole history every
+    turn, while the checkpointer already holds it. Feeding the full list back
+    into the same thread duplicates it on every turn.
+
+    User turns are aligned by content: the longest prefix of the client's user
+    messages that matches the tail of the thread's user messages is treated as
+    already stored (the client may hold a truncated window). Everything from
+    the first unmatched user message onward is new. Assistant messages before
+    that point are replies the thread already recorded (in tool-call-expanded
+    form) and are dropped. A retried request (no new user message) yields an
+    empty list rather than the last user message a second time.
+
+    Args:
+        client_messages: [{"role": ..., "content": ...}] as sent by the client.
+        thread_messages: LangChain messages currently in the checkpointed thread.
+
+    Returns:
+        The messages to pass as input for this turn.
+    """
+    if not thread_messages:
+        return list(client_messages)
+
+    thread_users = _thread_user_texts(thread_messages)
+    user_positions = [i for i, m in enumerate(client_messages) if m["role"] == "user"]
+    client_users = [_normalize(client_messages[i]["content"]) for i in user_positions]
+
+    matched = 0
+    for size in range(min(len(client_users), len(thread_users)), 0, -1):
+        if client_users[:size] == thread_users[-size:]:
+            matched = size
+            break
+
+    if matched == len(client_users):
+        # Nothing new from the user (e.g. a retried request): the thread already holds the
+        # last user turn, so append nothing; callers replay stored_reply() or continue the thread
+        logger.info("Client history adds no new user message; continuing the stored thread")
+        return []
+
+    if matched == 0 and thread_users:
+        # Diverged (history cleared or session reused): only the latest user turn is trustworthy
+        logger.info("Client history does not match the checkpointed thread; sending latest user turn")
+        return [client_messages[user_positions[-1]]]
+
+    return list(client_messages[user_positions[matched]:])
@@ -0,0 +1,18 @@
+import streamlit as st
+from services.ingestion_service import STAGES, ProgressCallback
+
+
+def streamlit_progress_callback() -> ProgressCallback:
+    """
+    Create one Streamlit progress bar per ingestion stage plus a throughput caption,
+    and return an ``on_progress`` callback for ``IngestionService.ingest_files`` that updates them.
+    """
+    bars = {stage: st.progress(0.0, text=f"{stage.title()}: waiting") for stage in STAGES}
+    throughput = st.empty()
+
+    def on_progress(stage, done, total, report):
+        fraction = done / total if total else 1.0
+        bars[stage].progress(fraction, text=f"{stage.title()}: {done}/{total}")
+        throughput.caption(report.throughput_summary())
+
+    return on_progress
@@ -0,0 +1,296 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from loguru import logger
+from services.document_parser import SUPPORTED_EXTENSIONS, parse_file
+from services.retriever_service import RetrieverService, retriever_service
+
+# Configuration
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "128"))
+WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "1024"))
+MAX_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Smaller uploads are parsed inline: starting worker processes costs more than parsing a few files
+PARSE_POOL_MIN_FILES = int(os.getenv("INGEST_PARSE_POOL_MIN_FILES", "4"))
+
+STAGES = ("parse", "embed", "write")
+
+# on_progress(stage, done, total, report)
+ProgressCallback = Callable[[str, int, int, "IngestionReport"], None]
+
+
+@dataclass
+class IngestionReport:
+    """Per-file outcome plus per-stage timings and throughput for one ingestion run."""
+
+    files: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    pages: int = 0
+    chunks: int = 0
+    embeddings: int = 0
+    new_chunks: int = 0
+    reused_chunks: int = 0
+    removed_chunks: int = 0
+    parse_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.parse_seconds if self.parse_seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        """End-to-end chunk throughput: parsing/splitting plus embedding."""
+        seconds = self.parse_seconds + self.embed_seconds
+        return self.chunks / seconds if seconds else 0.0
+
+    @property
+    def embeddings_per_second(self) -> float:
+        return self.embeddings / self.embed_seconds if self.embed_seconds else 0.0
+
+    def dedup_summary(self) -> str:
+        return (
+            f"🆕 {self.new_chunks} new | "
+            f"♻️ {self.reused_chunks} reused | "
+            f"🗑️ {self.removed_chunks} removed"
+        )
+
+    def throughput_summary(self) -> str:
+        return (
+            f"📄 {self.pages_per_second:.1f} pages/s | "
+            f"🧩 {self.chunks_per_second:.1f} chunks/s | "
+            f"🔢 {self.embeddings_per_second:.1f} embeddings/s"
+        )
+
+
+def chunk_id(chunk) -> str:
+    """
+    Deterministic ID for a chunk: hash of its text plus source, page and start_index.
+    Re-ingesting an unchanged file yields the same IDs, so nothing is duplicated.
+    """
+    metadata = chunk.metadata
+    key = "\x1f".join([
+        str(metadata.get("source", "")),
+        str(metadata.get("page", "")),
+        str(metadata.get("start_index", "")),
+        chunk.page_content,
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class IngestionService:
+    """Parses uploads in parallel, embeds in fixed-size batches and bulk-upserts into Chroma."""
+
+    def __init__(
+        self,
+        retriever: RetrieverService = retriever_service,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        write_batch_size: int = WRITE_BATCH_SIZE,
+        max_workers: int = MAX_PARSE_WORKERS,
+        pool_min_files: int = PARSE_POOL_MIN_FILES,
+    ):
+        self.retriever = retriever
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = write_batch_size
+        self.max_workers = max_workers
+        self.pool_min_files = pool_min_files
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _parse_pool(self) -> ProcessPoolExecutor:
+        """The parse worker pool, started on the first large upload and reused afterwards."""
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned, not forked: the Streamlit server holds torch, the embedding model and
+                # their threads/locks, which forked children would inherit in an arbitrary state.
+                # Workers only import services.document_parser.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool (e.g. a worker was killed) so the next upload starts a fresh one."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def ingest_files(
+        self,
+        files: List[Tuple[str, bytes]],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> IngestionReport:
+        """
+        Ingest a set of uploaded files into the knowledge base.
+
+        Args:
+            files: (file name, file bytes) pairs.
+            on_progress: Optional callback invoked as each stage advances.
+
+        Returns:
+            IngestionReport with per-file results and throughput numbers.
+        """
+        report = IngestionReport()
+        progress = on_progress or (lambda stage, done, total, report: None)
+
+        temp_dir = tempfile.mkdtemp(prefix="ingest_")
+        try:
+            chunks, sources = self._parse(files, temp_dir, report, progress)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        # Every parsed source is reconciled, including ones that now yield no chunks
+        if sources:
+            new_chunks, removed = self._reconcile(chunks, sources, report)
+            if new_chunks:
+                self._embed_and_write(new_chunks, report, progress)
+            # Old versions are deleted only once their replacements are stored
+            if removed:
+                self.retriever.db.delete(ids=removed)
+            if report.new_chunks or report.removed_chunks:
+                self.retriever.mark_index_updated()
+
+        logger.info(
+            f"Ingested {report.chunks} chunks from {len(files)} files "
+            f"({report.dedup_summary()}): {report.throughput_summary()}"
+        )
+        return report
+
+    def _parse(self, files, temp_dir, report, progress) -> Tuple[list, List[str]]:
+        jobs = []
+        for index, (name, data) in enumerate(files):
+            ext = name.split(".")[-1].lower()
+            if ext not in SUPPORTED_EXTENSIONS:
+                report.errors[name] = "Unsupported file type. Only PDF, TXT, and MD are supported."
+                continue
+            # Index prefix: uploads sharing a file name must not overwrite each other
+            path = os.path.join(temp_dir, f"{index}_{os.path.basename(name)}")
+            with open(path, "wb") as f:
+                f.write(data)
+            jobs.append((path, name))
+
+        progress("parse", 0, len(jobs), report)
+        start = time.perf_counter()
+        all_chunks = []
+        sources = []
+
+        def collect(name, result, done):
+            chunks, pages = result
+            report.pages += pages
+            report.chunks += len(chunks)
+            report.files[name] = "No text found."
+            all_chunks.extend(chunks)
+            sources.append(name)
+            progress("parse", done, len(jobs), report)
+
+        if len(jobs) >= max(self.pool_min_files, 2) and self.max_workers > 1:
+            pool = self._parse_pool()
+            futures = [(name, pool.submit(parse_file, path, name)) for path, name in jobs]
+            for done, (name, future) in enumerate(futures, 1):
+                try:
+                    collect(name, future.result(), done)
+                except BrokenProcessPool as e:
+                    report.errors[name] = str(e)
+                    self._discard_pool(pool)
+                except Exception as e:
+                    report.errors[name] = str(e)
+        else:
+            for done, (path, name) in enumerate(jobs, 1):
+                try:
+                    collect(name, parse_file(path, name), done)
+                except Exception as e:
+                    report.errors[name] = str(e)
+
+        report.parse_seconds = time.perf_counter() - start
+        return all_chunks, sources
+
+    def _reconcile(self, chunks, sources, report) -> Tuple[list, List[str]]:
+        """
+        Compare freshly parsed chunks with what each parsed source already has in Chroma.
+
+        Returns:
+            (new (id, chunk) pairs that need embedding, ids of chunks that disappeared).
+            Nothing is deleted here, so a failed embed or write leaves the old version intact.
+        """
+        db = self.retriever.db
+        by_source: Dict[str, Dict[str, object]] = {source: {} for source in sources}
+        for chunk in chunks:
+            by_source.setdefault(chunk.metadata["source"], {})[chunk_id(chunk)] = chunk
+
+        new_chunks = []
+        all_removed: List[str] = []
+        for source, chunks_by_id in by_source.items():
+            existing = set(db.get(where={"source": source}, include=[])["ids"])
+            current = set(chunks_by_id)
+            removed = existing - current
+            all_removed.extend(removed)
+
+            added = [(cid, chunk) for cid, chunk in chunks_by_id.items() if cid not in existing]
+            reused = len(current) - len(added)
+            new_chunks.extend(added)
+
+            report.new_chunks += len(added)
+            report.reused_chunks += reused
+            report.removed_chunks += len(removed)
+            if not current:
+                report.files[source] = f"No text found ({len(removed)} old chunks removed)." if removed else "No text found."
+                continue
+            report.files[source] = (
+                f"Added {len(added)} chunks to Document DB "
+                f"({reused} unchanged, {len(removed)} removed)."
+            )
+        return new_chunks, all_removed
+
+    def _embed_and_write(self, chunks, report, progress) -> None:
+        embeddings = self.retriever.embeddings
+        # The vectors are computed here in batches; Chroma's public add/update methods would
+        # embed the texts again, so precomputed batches go to the underlying collection
+        collection = self.retriever.db._collection
+        total = len(chunks)
+        pending = {"ids": [], "embeddings": [], "metadatas": [], "documents": []}
+        written = 0
+
+        def flush():
+            nonlocal written
+            if not pending["ids"]:
+                return
+            start = time.perf_counter()
+            collection.upsert(**pending)
+            report.write_seconds += time.perf_counter() - start
+            written += len(pending["ids"])
+            for values in pending.values():
+                values.clear()
+            progress("write", written, total, report)
+
+        progress("embed", 0, total, report)
+        progress("write", 0, total, report)
+        for offset in range(0, total, self.embed_batch_size):
+            batch = chunks[offset:offset + self.embed_batch_size]
+            texts = [chunk.page_content for _, chunk in batch]
+
+            start = time.perf_counter()
+            vectors = embeddings.embed_documents(texts)
+            report.embed_seconds += time.perf_counter() - start
+            report.embeddings += len(vectors)
+            progress("embed", report.embeddings, total, report)
+
+            pending["ids"].extend(cid for cid, _ in batch)
+            pending["embeddings"].extend(vectors)
+            pending["metadatas"].extend(chunk.metadata for _, chunk in batch)
+            pending["documents"].extend(texts)
+            if len(pending["ids"]) >= self.write_batch_size:
+                flush()
+        flush()
+
+
+# Global service instance
+ingestion_service = IngestionService()
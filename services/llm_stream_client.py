@@ -0,0 +1,161 @@
+import os
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+import httpx
+from loguru import logger
+
+# Configuration
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+# Connect fails fast so the chat page can fall back to the in-process agent; reads wait on slow tools
+BACKEND_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BACKEND_CONNECT_TIMEOUT_SECONDS", "2"))
+BACKEND_READ_TIMEOUT_SECONDS = float(os.getenv("BACKEND_READ_TIMEOUT_SECONDS", "120"))
+
+
+class BackendUnavailable(Exception):
+    """The backend could not be reached before any content was streamed."""
+
+
+@dataclass
+class StreamTiming:
+    """Latency of one streamed reply, filled in while it is consumed."""
+
+    start: float = 0.0
+    first_token: Optional[float] = None
+    end: Optional[float] = None
+    chunks: int = 0
+    source: str = "backend"
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return self.first_token - self.start if self.first_token is not None else None
+
+    @property
+    def total(self) -> Optional[float]:
+        return self.end - self.start if self.end is not None else None
+
+    def mark(self, text: str) -> str:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.chunks += 1
+        return text
+
+
+class LLMStreamClient:
+    """
+    Sync client for the backend's ``/llm/stream`` SSE endpoint.
+
+    Keeps one pooled ``httpx.Client`` so every chat turn reuses the same
+    keep-alive connection. ``stream()`` yields content chunks as they arrive.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BACKEND_URL,
+        connect_timeout: float = BACKEND_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = BACKEND_READ_TIMEOUT_SECONDS,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self._client = httpx.Client(
+            base_url=base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        session_id: str,
+        timing: Optional[StreamTiming] = None,
+        tts: bool = False,
+    ) -> Iterator[str]:
+        """
+        Yield reply chunks for ``messages`` (the client-held history).
+        Raises BackendUnavailable if the backend cannot be reached (connection
+        refused or not accepted within the connect timeout); a backend
+        error reported mid-stream is raised as RuntimeError.
+        """
+        timing = timing or StreamTiming()
+        timing.start = time.perf_counter()
+        try:
+            with self._client.stream(
+                "POST",
+                "/llm/stream",
+                params={"session_id": session_id, "tts": str(tts).lower()},
+                json={"messages": messages},
+            ) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    raise RuntimeError(f"Backend returned {response.status_code}: {response.text[:200]}")
+                for line in response.iter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[6:])
+                    if data.get("error"):
+                        raise RuntimeError(data["error"])
+                    content = data.get("content")
+                    if content:
+                        yield timing.mark(content)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # ConnectTimeout is not a ConnectError: a backend slow to accept connections is also unavailable
+            raise BackendUnavailable(f"{self.base_url} unreachable: {e}") from e
+        finally:
+            timing.end = time.perf_counter()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def stream_in_process(messages: List[Dict[str, str]], session_id: str, timing: Optional[StreamTiming] = None) -> Iterator[str]:
+    """
+    Same stream as the backend, produced by the agent in this process
+    (used when no backend is running). Imports the agent on first use.
+    """
+    from scripts.agent import build_agent_config, get_agent
+    from services.history_sync import select_new_messages, stored_reply
+    from services.sentence_stream import iterate_in_thread
+
+    timing = timing or StreamTiming()
+    timing.source = "in-process"
+    timing.start = time.perf_counter()
+    agent = get_agent()
+
+    async def chunks():
+        config = build_agent_config(session_id)
+        state = await agent.aget_state(config)
+        thread_messages = state.values.get("messages", [])
+        new_messages = select_new_messages(messages, thread_messages)
+        # A retry after the reply was checkpointed: send the stored reply, don't answer twice
+        reply = stored_reply(thread_messages) if not new_messages else None
+        if reply is not None:
+            yield reply
+            return
+        async for event in agent.astream_events({"messages": new_messages}, config=config, version="v1"):
+            if event["event"] == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    yield content
+
+    try:
+        for content in iterate_in_thread(chunks):
+            yield timing.mark(content)
+    finally:
+        timing.end = time.perf_counter()
+
+
+def stream_reply(messages: List[Dict[str, str]], session_id: str, timing: Optional[StreamTiming] = None) -> Iterator[str]:
+    """Stream from the backend, falling back to the in-process agent if it is not running."""
+    timing = timing or StreamTiming()
+    try:
+        yield from llm_stream_client.stream(messages, session_id, timing)
+    except BackendUnavailable as e:
+        if timing.chunks:
+            raise
+        logger.warning(f"⚠️ {e}; streaming from the in-process agent instead")
+        yield from stream_in_process(messages, session_id, timing)
+
+
+# Global client instance
+llm_stream_client = LLMStreamClient()
@@ -0,0 +1,85 @@
+import os
+import re
+import sys
+from typing import Any, Dict, Optional
+from loguru import logger
+
+# Configuration
+# "pretty": colored one-line console output; "json": one JSON object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "pretty").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-subsystem overrides by module prefix, e.g. "tools=WARNING,services.retriever_service=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+
+PRETTY_FORMAT = "<green>{time:HH:mm:ss}</green> | {message}"
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Handler installed by configure_logging (so a second call replaces it instead of duplicating)
+_handler_id: Optional[int] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """``"tools=WARNING, services.stt_service=DEBUG"`` -> ``{"tools": "WARNING", ...}``."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            module, level = item.split("=", 1)
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+
+def _strip_ansi(record: Dict[str, Any]) -> None:
+    record["message"] = ANSI_ESCAPE.sub("", record["message"])
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    levels: Optional[Dict[str, str]] = None,
+    fmt: str = LOG_FORMAT,
+    sink: Any = None,
+    enqueue: bool = True,
+) -> int:
+    """
+    Install the process-wide log handler used by the voice app and the backend.
+
+    - Records go through loguru's queue (``enqueue=True``): the calling thread
+      only pickles the record, a background thread does the formatting and
+      the write, so logging never blocks the streaming path on stdout.
+    - Levels are per subsystem (module prefix). Records below a module's level
+      are rejected by loguru before the message is formatted, so
+      ``logger.debug("... {}", value)`` costs almost nothing when disabled.
+    - ``fmt="json"`` emits loguru's serialized records; fields bound with
+      ``logger.bind(event=..., ...)`` appear under ``record.extra``.
+
+    Only loguru's default stderr handler and our own previous handler are
+    removed; handlers added by other code stay in place.
+    """
+    global _handler_id
+
+    if _handler_id is not None:
+        logger.remove(_handler_id)
+    else:
+        try:
+            logger.remove(0)  # loguru's default stderr handler
+        except ValueError:
+            pass
+
+    module_levels: Dict[str, Any] = {"": level}
+    module_levels.update(parse_levels(LOG_LEVELS) if levels is None else levels)
+
+    json_output = fmt == "json"
+    # Console colors are part of some messages; keep them out of JSON logs
+    logger.configure(patcher=_strip_ansi if json_output else None)
+
+    _handler_id = logger.add(
+        sink or sys.stdout,
+        level=min(logger.level(lvl).no for lvl in module_levels.values()),
+        filter=module_levels,
+        format="{message}" if json_output else PRETTY_FORMAT,
+        serialize=json_output,
+        enqueue=enqueue,
+        colorize=None if not json_output else False,
+        backtrace=False,
+        diagnose=False,
+    )
+    return _handler_id
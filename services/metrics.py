@@ -0,0 +1,292 @@
+import os
+import abc
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from loguru import logger
+from services.tool_metrics import LATENCY_BUCKETS
+
+# Configuration
+# Opt-in port for a standalone exporter when app.py runs under Gradio's own server
+# (unset/0: off; /metrics is already served when the app runs as `uvicorn app:app`)
+VOICE_METRICS_PORT = int(os.getenv("VOICE_METRICS_PORT", "0"))
+# Exporter port for the Streamlit process (token pool, ingestion); 0 disables it
+STREAMLIT_METRICS_PORT = int(os.getenv("STREAMLIT_METRICS_PORT", "9101"))
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Turn-level latencies: sub-second STT/first chunk up to slow multi-tool turns
+TURN_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values: str, **kwargs: str):
+        """Child series for one label combination; keep the result around on hot paths."""
+        key = tuple(kwargs[name] for name in self.labelnames) if kwargs else tuple(values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abc.abstractmethod
+    def _new_child(self):
+        ...
+
+    @abc.abstractmethod
+    def _samples(self) -> Iterable[str]:
+        ...
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}", *self._samples()]
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, seconds: float) -> None:
+        self._children[()].observe(seconds)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {running}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {running}"
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-compatible registry.
+
+    Observations are a bisect plus a short lock per series, so recording on the
+    streaming path costs microseconds; all formatting happens at scrape time.
+    Collectors let other subsystems (e.g. the tool executor) contribute lines
+    without keeping their own series here.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = TURN_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# ----------------------------- pipeline metrics -----------------------------
+# "pipeline" is "voice" (FastRTC app) or "backend" (Anam /llm/stream)
+
+STT_SECONDS = registry.histogram("voice_stt_seconds", "Speech-to-text latency per turn.")
+STT_UTTERANCES = registry.counter(
+    "stt_utterances_total", "Utterances sent to the STT engine, by engine and outcome (ok, empty, error, timeout).",
+    ["engine", "outcome"],
+)
+LLM_FIRST_CHUNK_SECONDS = registry.histogram(
+    "llm_first_chunk_seconds", "Time from request to the first streamed LLM chunk.", ["pipeline"]
+)
+LLM_SECONDS = registry.histogram("llm_seconds", "Total agent time per turn, tools included.", ["pipeline"])
+TTS_FIRST_BYTE_SECONDS = registry.histogram(
+    "voice_tts_first_byte_seconds", "Time from the first TTS request of a turn to its first audio chunk."
+)
+TURN_SECONDS = registry.histogram("turn_seconds", "End-to-end latency per turn.", ["pipeline"])
+TURNS = registry.counter("turns_total", "Conversation turns handled.", ["pipeline"])
+SESSIONS = registry.counter("sessions_total", "New conversation threads started.", ["pipeline"])
+ERRORS = registry.counter("errors_total", "Failed turns by stage.", ["pipeline", "stage"])
+LLM_OUTPUT_TOKENS = registry.counter(
+    "llm_output_tokens_total", "Streamed LLM content chunks (Cerebras streams about one token per chunk).", ["pipeline"]
+)
+
+
+def tool_metrics_collector(executor) -> Callable[[], List[str]]:
+    """Expose a ToolExecutor's per-tool histograms, outcome counts and cache stats."""
+
+    def collect() -> List[str]:
+        snapshot = executor.metrics.snapshot()
+        lines = [
+            "# HELP tool_latency_seconds Tool call wall time.",
+            "# TYPE tool_latency_seconds histogram",
+        ]
+        for tool, stats in snapshot["tools"].items():
+            latency = stats["latency"]
+            for bound, count in latency["buckets"].items():
+                le = "+Inf" if bound == "+Inf" else _format_value(float(bound))
+                lines.append(f"tool_latency_seconds_bucket{_format_labels(('tool', 'le'), (tool, le))} {count}")
+            lines.append(f"tool_latency_seconds_sum{_format_labels(('tool',), (tool,))} {latency['sum']}")
+            lines.append(f"tool_latency_seconds_count{_format_labels(('tool',), (tool,))} {latency['count']}")
+        lines += ["# HELP tool_calls_total Tool calls by outcome.", "# TYPE tool_calls_total counter"]
+        for tool, stats in snapshot["tools"].items():
+            for outcome, count in stats["calls"].items():
+                lines.append(f"tool_calls_total{_format_labels(('tool', 'outcome'), (tool, outcome))} {count}")
+        lines += ["# HELP tool_cache_lookups_total Tool cache lookups by result.", "# TYPE tool_cache_lookups_total counter"]
+        for cache, stats in snapshot["caches"].items():
+            for result in ("hits", "misses", "coalesced", "stale"):
+                if isinstance(stats.get(result), (int, float)):
+                    lines.append(f"tool_cache_lookups_total{_format_labels(('cache', 'result'), (cache, result))} {stats[result]}")
+        return lines
+
+    return collect
+
+
+# ----------------------------- standalone exporter -----------------------------
+
+def start_metrics_server(
+    port: int, host: str = "0.0.0.0", metrics_registry: MetricsRegistry = registry
+) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve ``/metrics`` from a daemon thread (for processes whose main server is not ours, e.g. Gradio).
+    Returns None, with a warning, if the port cannot be bound; metrics are optional.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics_registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        logger.warning(f"⚠️ Metrics exporter not started on {host}:{port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"⚡ Metrics exporter listening on http://{host}:{port}/metrics")
+    return server
+
+
+_servers: Dict[int, Optional[ThreadingHTTPServer]] = {}
+_servers_lock = threading.Lock()
+
+
+def ensure_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """``start_metrics_server`` at most once per process and port (safe on every Streamlit rerun)."""
+    with _servers_lock:
+        if port not in _servers:
+            _servers[port] = start_metrics_server(port, host)
+        return _servers[port]
+
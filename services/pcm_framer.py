@@ -0,0 +1,137 @@
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+ELEMENT_SIZE = 4  # pcm_f32le
+
+
+class PCMFramer:
+    """
+    Reassembles raw float32 PCM byte chunks into NumPy frames without re-copying the stream.
+
+    Whole frames that sit inside an incoming chunk are returned as
+    ``np.frombuffer`` views over that chunk. Only the bytes that straddle a
+    chunk boundary (at most one frame, including odd-byte sample remainders)
+    are copied into a small carry-over buffer.  In pass-through mode a chunk
+    that starts mid-sample is copied once to realign it.
+
+    Args:
+        sample_rate: Sample rate of the PCM stream.
+        frame_ms: Frame duration to emit. ``None``/0 emits every whole sample
+            available per chunk, which matches the chunking Cartesia delivers.
+    """
+
+    def __init__(self, sample_rate: int = 24000, frame_ms: Optional[float] = None):
+        self.sample_rate = sample_rate
+        if frame_ms:
+            samples = max(1, int(sample_rate * frame_ms / 1000))
+            self.frame_bytes = samples * ELEMENT_SIZE
+        else:
+            self.frame_bytes = None
+        self._carry = bytearray()
+
+    def push(self, chunk: bytes) -> List[np.ndarray]:
+        """Feed one chunk and return every frame it completes."""
+        frames = []
+
+        if not self._carry and not self.frame_bytes:
+            # Fast path: aligned pass-through is a single view over the chunk
+            count = len(chunk) // ELEMENT_SIZE
+            if count:
+                frames.append(np.frombuffer(chunk, dtype=np.float32, count=count))
+            if len(chunk) % ELEMENT_SIZE:
+                self._carry += memoryview(chunk)[count * ELEMENT_SIZE:]
+            return frames
+
+        view = memoryview(chunk).cast("B")
+
+        if self._carry:
+            if self.frame_bytes:
+                take = min(self.frame_bytes - len(self._carry), len(view))
+                self._carry += view[:take]
+                view = view[take:]
+                if len(self._carry) < self.frame_bytes:
+                    return frames
+                frames.append(np.frombuffer(bytes(self._carry), dtype=np.float32))
+                self._carry.clear()
+            else:
+                # Misaligned stream: merge the partial sample with this chunk (copies this chunk only)
+                self._carry += view
+                view = memoryview(bytes(self._carry))
+                self._carry.clear()
+
+        step = self.frame_bytes or (len(view) - len(view) % ELEMENT_SIZE)
+        offset = 0
+        if step:
+            while len(view) - offset >= step:
+                frames.append(np.frombuffer(view[offset:offset + step], dtype=np.float32))
+                offset += step
+        if offset < len(view):
+            self._carry += view[offset:]
+        return frames
+
+    def flush(self) -> List[np.ndarray]:
+        """Return the remaining partial frame, zero-padding a trailing partial sample."""
+        if not self._carry:
+            return []
+        rem = len(self._carry) % ELEMENT_SIZE
+        if rem:
+            self._carry += b"\x00" * (ELEMENT_SIZE - rem)
+        frame = np.frombuffer(bytes(self._carry), dtype=np.float32)
+        self._carry.clear()
+        return [frame]
+
+    def frames(self, chunks: Iterable[bytes]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Frame a whole chunk stream as FastRTC ``(sample_rate, array)`` tuples."""
+        for chunk in chunks:
+            for frame in self.push(chunk):
+                yield (self.sample_rate, frame)
+        for frame in self.flush():
+            yield (self.sample_rate, frame)
+
+
+def _legacy_frames(chunks: Iterable[bytes], sample_rate: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """The original generate_speech reassembly loop, kept for benchmarking."""
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        n = len(buffer) // ELEMENT_SIZE
+        if n:
+            size = n * ELEMENT_SIZE
+            block = buffer[:size]
+            buffer = buffer[size:]
+            yield (sample_rate, np.frombuffer(block, dtype=np.float32))
+    if buffer:
+        rem = len(buffer) % ELEMENT_SIZE
+        if rem:
+            buffer += b"\x00" * (ELEMENT_SIZE - rem)
+        yield (sample_rate, np.frombuffer(buffer, dtype=np.float32))
+
+
+def benchmark(seconds_of_audio: float = 60.0, chunk_sizes=(4096, 4099, 65536), repeats: int = 5) -> None:
+    """Compare the legacy reassembly loop with PCMFramer on aligned and odd-sized chunks."""
+    sample_rate = 24000
+    audio = np.random.default_rng(0).standard_normal(int(sample_rate * seconds_of_audio)).astype(np.float32)
+    raw = audio.tobytes()
+
+    for chunk_bytes in chunk_sizes:
+        chunks = [raw[i:i + chunk_bytes] for i in range(0, len(raw), chunk_bytes)]
+        print(f"{seconds_of_audio:.0f}s of audio in {len(chunks)} chunks of {chunk_bytes} bytes")
+
+        def run(label, make_frames):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                frames = [frame for _, frame in make_frames()]
+                best = min(best, time.perf_counter() - start)
+            out = np.concatenate(frames)
+            assert np.array_equal(out[:len(audio)], audio), label
+            print(f"  {label:<24} {best * 1000:8.2f} ms  {len(frames):6d} frames")
+
+        run("legacy bytes concat", lambda: _legacy_frames(chunks, sample_rate))
+        run("PCMFramer pass-through", lambda: PCMFramer(sample_rate).frames(chunks))
+        run("PCMFramer 20ms frames", lambda: PCMFramer(sample_rate, frame_ms=20).frames(chunks))
+
+
+if __name__ == "__main__":
+    benchmark()
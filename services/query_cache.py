@@ -0,0 +1,102 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so rephrasings like 'Refund policy?' share a key."""
+    text = _PUNCTUATION.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query vectors and top-k results.
+
+    Exact hits are keyed on the normalized query text. When a similarity
+    threshold is set, a miss on the text key can still be served from the
+    entry whose query embedding has the highest cosine similarity, as long as
+    it is at or above the threshold.
+    """
+
+    def __init__(self, max_entries: int = 256, similarity_threshold: Optional[float] = None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, List[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, query: str, k: int) -> Optional[List[Any]]:
+        """Return cached results for an exact (normalized) query match."""
+        key = (normalize_query(query), k)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[1]
+
+    def get_similar(self, vector: Sequence[float], k: int) -> Optional[List[Any]]:
+        """Return results of the closest cached query within the cosine threshold."""
+        if not self.similarity_threshold:
+            return None
+        query_vec = _unit(vector)
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == k]
+            if not keys:
+                return None
+            matrix = np.stack([self._entries[key][0] for key in keys])
+            scores = matrix @ query_vec
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+            key = keys[best]
+            self._entries.move_to_end(key)
+            self._counters["near_hits"] += 1
+            return self._entries[key][1]
+
+    def put(self, query: str, vector: Sequence[float], k: int, results: List[Any]) -> None:
+        """Store a query vector and its results, evicting the least recently used entry."""
+        key = (normalize_query(query), k)
+        with self._lock:
+            self._entries[key] = (_unit(vector), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after ingestion wrote new chunks."""
+        with self._lock:
+            self._entries.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["near_hits"]) / lookups if lookups else None
+        return stats
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm else arr
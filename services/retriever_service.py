@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+from langchain_chroma import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+from loguru import logger
+from config.settings import CHROMA_PATH, EMBEDDING_MODEL
+from services.query_cache import QueryCache
+from services.tool_executor import tool_executor
+
+# Configuration
+# Written by ingestion whenever chunks are added, so every process can drop stale cache entries
+INDEX_STAMP_FILE = ".index_version"
+QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "256"))
+# Cosine similarity for reusing a rephrased query's results; 0 disables the near-duplicate tier
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("RAG_NEAR_DUPLICATE_THRESHOLD", "0.95"))
+
+
+class RetrieverService:
+    """Process-wide embedding model and Chroma handle for RAG queries."""
+
+    def __init__(
+        self,
+        persist_directory: str = CHROMA_PATH,
+        model_name: str = EMBEDDING_MODEL,
+    ):
+        """Initialize the retriever service. Nothing is loaded until first use."""
+        self.persist_directory = persist_directory
+        self.model_name = model_name
+        self._embeddings = None
+        self._db = None
+        self._lock = threading.Lock()
+        self.cache = QueryCache(
+            max_entries=QUERY_CACHE_SIZE,
+            similarity_threshold=NEAR_DUPLICATE_THRESHOLD or None,
+        )
+        self._index_version = self._read_index_version()
+        self._stats = {
+            "model_load_seconds": None,
+            "db_open_seconds": None,
+            "queries": 0,
+            "query_errors": 0,
+            "total_query_seconds": 0.0,
+            "last_query_seconds": None,
+        }
+
+    @property
+    def embeddings(self):
+        """Shared HuggingFaceEmbeddings instance, loaded once per process."""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    start = time.perf_counter()
+                    self._embeddings = HuggingFaceEmbeddings(model_name=self.model_name)
+                    self._stats["model_load_seconds"] = time.perf_counter() - start
+                    logger.info(
+                        f"Loaded embedding model {self.model_name} "
+                        f"in {self._stats['model_load_seconds']:.2f}s"
+                    )
+        return self._embeddings
+
+    @property
+    def db(self):
+        """Shared Chroma handle bound to the persistent store."""
+        if self._db is None:
+            embeddings = self.embeddings
+            with self._lock:
+                if self._db is None:
+                    start = time.perf_counter()
+                    self._db = Chroma(
+                        persist_directory=self.persist_directory,
+                        embedding_function=embeddings,
+                    )
+                    self._stats["db_open_seconds"] = time.perf_counter() - start
+                    logger.info(
+                        f"Opened Chroma store at {self.persist_directory} "
+                        f"in {self._stats['db_open_seconds']:.2f}s"
+                    )
+        return self._db
+
+    def is_available(self) -> bool:
+        """Whether the persistent store exists on disk."""
+        return os.path.exists(self.persist_directory)
+
+    @property
+    def index_stamp_path(self) -> str:
+        return os.path.join(self.persist_directory, INDEX_STAMP_FILE)
+
+    def _read_index_version(self) -> int:
+        try:
+            return os.stat(self.index_stamp_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def mark_index_updated(self) -> None:
+        """Record that ingestion wrote new chunks and drop cached results."""
+        os.makedirs(self.persist_directory, exist_ok=True)
+        with open(self.index_stamp_path, "w") as f:
+            f.write(str(time.time_ns()))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self.cache.clear()
+        with self._lock:
+            # Reopen on next query so writes from the ingestion process are visible
+            self._db = None
+        self._index_version = self._read_index_version()
+
+    def _check_index_version(self) -> None:
+        if self._read_index_version() != self._index_version:
+            logger.info("Knowledge base changed, invalidating RAG query cache")
+            self._invalidate()
+
+    def warm(self) -> None:
+        """Load the model and open the store ahead of the first query."""
+        _ = self.embeddings
+        if self.is_available():
+            _ = self.db
+
+    def search(self, query: str, k: int = 3) -> List[Any]:
+        """
+        Return the top-k documents for a query.
+
+        Args:
+            query: The search query.
+            k: Number of chunks to return.
+
+        Returns:
+            List of LangChain Document objects.
+        """
+        start = time.perf_counter()
+        self._check_index_version()
+        try:
+            results = self.cache.get(query, k)
+            if results is None:
+                vector = self.embeddings.embed_query(query)
+                results = self.cache.get_similar(vector, k)
+                if results is None:
+                    self.cache.record_miss()
+                    results = self.db.similarity_search_by_vector(vector, k=k)
+                    self.cache.put(query, vector, k, results)
+        except Exception:
+            self._stats["query_errors"] += 1
+            raise
+        elapsed = time.perf_counter() - start
+        self._stats["queries"] += 1
+        self._stats["total_query_seconds"] += elapsed
+        self._stats["last_query_seconds"] = elapsed
+        return results
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of load and query timings."""
+        stats = dict(self._stats)
+        queries = stats["queries"]
+        stats["avg_query_seconds"] = (
+            stats["total_query_seconds"] / queries if queries else None
+        )
+        stats["model_loaded"] = self._embeddings is not None
+        stats["db_open"] = self._db is not None
+        stats["cache"] = self.cache.stats()
+        return stats
+
+
+# Global service instance
+retriever_service = RetrieverService()
+# Hit rates on /metrics, next to the latency of the tool that reads through this cache
+tool_executor.metrics.register_cache("rag_query", retriever_service.cache.stats, ["database_search"])
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from loguru import logger
+from services.tool_executor import tool_executor
+
+# Configuration
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", "scrape_cache")
+# Travel prices move; keep scraped pages for 30 minutes by default
+SCRAPE_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "1800"))
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys: lowercase, no fragment, sorted query, no trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.lower().rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), path, query, ""))
+
+
+class ScrapeCache:
+    """
+    Disk-backed cache of scraped pages, one JSON file per normalized URL.
+
+    Entries store the raw scraped content so extraction can change without
+    invalidating the cache. Writes are atomic (temp file + rename), so a crash
+    or a concurrent reader never sees a half-written entry.
+    """
+
+    def __init__(self, directory: str = SCRAPE_CACHE_DIR, ttl: float = SCRAPE_CACHE_TTL_SECONDS):
+        self.directory = directory
+        self.ttl = ttl
+        self._counters = {"hits": 0, "misses": 0, "stale": 0}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, url: str, record: bool = True) -> Optional[Dict[str, Any]]:
+        """Fresh entry for ``url`` (``content``, ``metadata``, ``fetched_at``), or None."""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is None:
+            outcome = "misses"
+        elif time.time() - entry.get("fetched_at", 0) > self.ttl:
+            outcome, entry = "stale", None
+        else:
+            outcome = "hits"
+        if record:
+            self._count(outcome)
+        return entry
+
+    def put(self, url: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        entry = {
+            "url": normalize_url(url),
+            "fetched_at": time.time(),
+            "content": content,
+            "metadata": metadata or {},
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.prune()
+        return entry
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        removed = 0
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+class ScrapeService:
+    """Firecrawl scrapes behind the disk cache; concurrent scrapes of one URL share a single fetch."""
+
+    def __init__(self, cache: Optional[ScrapeCache] = None, scraper: Any = None):
+        self.cache = cache or ScrapeCache()
+        self.scraper = scraper or self._firecrawl_scrape
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def _firecrawl_scrape(url: str) -> Tuple[str, Dict[str, Any]]:
+        from langchain_community.document_loaders.firecrawl import FireCrawlLoader
+
+        loader = FireCrawlLoader(
+            api_key=os.getenv("FIRECRAWL_API_KEY"),
+            url=url,
+            mode="scrape"
+        )
+        docs = loader.load()
+        if not docs:
+            return "", {}
+        return docs[0].page_content, dict(docs[0].metadata)
+
+    def scrape(self, url: str) -> Tuple[str, Dict[str, Any], bool]:
+        """Return ``(content, metadata, from_cache)`` for ``url``."""
+        entry = self.cache.get(url)
+        if entry is not None:
+            return entry["content"], entry["metadata"], True
+
+        key = normalize_url(url)
+        with self._locks_guard:
+            lock = self._url_locks.setdefault(key, threading.Lock())
+        with lock:
+            # Another caller may have filled the cache while we waited
+            entry = self.cache.get(url, record=False)
+            if entry is not None:
+                return entry["content"], entry["metadata"], True
+
+            start = time.perf_counter()
+            content, metadata = self.scraper(url)
+            logger.info(f"Scraped {key} in {time.perf_counter() - start:.2f}s ({len(content)} chars)")
+            if content:
+                self.cache.put(url, content, metadata)
+            return content, metadata, False
+
+
+def log_payload_sizes(tool: str, raw: str, extracted: str, from_cache: bool) -> None:
+    """Log how much smaller the extracted table is than the cached page (≈4 chars per token)."""
+    saved = 1 - len(extracted) / len(raw) if raw else 0.0
+    logger.info(
+        f"⚡ Scrape [{tool}]: {'cache hit' if from_cache else 'fetched'} | "
+        f"cached={len(raw)} chars (~{len(raw) // 4} tokens) | "
+        f"extracted={len(extracted)} chars (~{len(extracted) // 4} tokens) | "
+        f"saved {saved:.0%}"
+    )
+
+
+# Global service instance
+scrape_service = ScrapeService()
+# Hit rates on /metrics, next to the latency of the tools that read through this cache
+tool_executor.metrics.register_cache("scrape", scrape_service.cache.stats, ["search_flights", "search_hotels"])
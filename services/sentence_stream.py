@@ -0,0 +1,96 @@
+import re
+import queue
+from typing import AsyncIterator, Callable, Iterator, List, TypeVar
+from services.async_runner import background_loop
+
+T = TypeVar("T")
+
+# Sentence end: terminator followed by whitespace (so "3.50" or "e.g.x" do not split)
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+# Clause end: used only once the buffer is long enough to be worth speaking on its own
+_CLAUSE_END = re.compile(r"[,;:—]\s+")
+
+
+class SentenceChunker:
+    """
+    Accumulates streamed LLM tokens and emits speakable segments as soon as they complete.
+
+    A segment ends at a sentence terminator or newline. When a sentence runs
+    longer than ``max_clause_chars``, it is also cut at the last clause break
+    so TTS can start before the full sentence arrives.
+    """
+
+    def __init__(self, min_chars: int = 12, max_clause_chars: int = 80):
+        self.min_chars = min_chars
+        self.max_clause_chars = max_clause_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add a token chunk and return any segments that are now complete."""
+        self._buffer += text
+        segments = []
+
+        while True:
+            match = None
+            for candidate in _SENTENCE_END.finditer(self._buffer):
+                if candidate.end() >= self.min_chars:
+                    match = candidate
+                    break
+            if match is None and len(self._buffer) >= self.max_clause_chars:
+                clauses = list(_CLAUSE_END.finditer(self._buffer))
+                if clauses and clauses[-1].end() >= self.min_chars:
+                    match = clauses[-1]
+            if match is None:
+                break
+
+            segment = self._buffer[:match.end()].strip()
+            self._buffer = self._buffer[match.end():]
+            if segment:
+                segments.append(segment)
+
+        return segments
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the token stream has ended."""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return [segment] if segment else []
+
+
+def iterate_in_thread(make_async_iter: Callable[[], AsyncIterator[T]]) -> Iterator[T]:
+    """
+    Drive an async iterator on the process-wide background loop and yield its
+    items synchronously.
+
+    Lets sync handlers (e.g. the FastRTC ReplyOnPause generator) consume
+    ``agent.astream_events`` while the LLM keeps generating in the background.
+    Every turn shares one loop, so per-loop HTTP connection pools are reused
+    instead of being rebuilt (and leaked) with a fresh loop per turn.
+    Closing the returned generator cancels the producer.
+    """
+    items: "queue.Queue" = queue.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async for item in make_async_iter():
+                items.put(item)
+        except BaseException as e:
+            items.put(e)
+        finally:
+            items.put(done)
+
+    # Scheduled from this thread, so the task runs under a copy of the caller's
+    # context and context variables (e.g. tool timings) carry over
+    future = background_loop.submit(produce())
+
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        future.cancel()
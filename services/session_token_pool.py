@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import asyncio
+import weakref
+import threading
+import concurrent.futures
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Set
+from loguru import logger
+from services.anam_service import (
+    ANAM_BACKOFF_MAX_SECONDS,
+    ANAM_MAX_ATTEMPTS,
+    ANAM_TIMEOUT_SECONDS,
+    AnamService,
+    SessionTokenResult,
+    anam_service,
+)
+from services.async_runner import BackgroundLoop, background_loop
+from services.metrics import registry
+
+# Configuration
+# Tokens kept ready per persona config (0 disables pre-minting: every acquire goes to the API)
+ANAM_TOKEN_POOL_SIZE = int(os.getenv("ANAM_TOKEN_POOL_SIZE", "2"))
+# Lifetime assumed when the API response carries no expiresIn
+ANAM_TOKEN_TTL_SECONDS = float(os.getenv("ANAM_TOKEN_TTL_SECONDS", "300"))
+# Tokens this close to expiry are dropped instead of handed out
+ANAM_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("ANAM_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+# Persona configs not acquired for this long stop being refilled
+ANAM_TOKEN_POOL_IDLE_SECONDS = float(os.getenv("ANAM_TOKEN_POOL_IDLE_SECONDS", "1800"))
+# Longest a blocking acquire waits on a miss: every attempt timing out plus the longest
+# waits between attempts (a Retry-After is capped at 5x the backoff cap), with 1s headroom
+ANAM_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv(
+    "ANAM_ACQUIRE_TIMEOUT_SECONDS",
+    str(ANAM_TIMEOUT_SECONDS * ANAM_MAX_ATTEMPTS + ANAM_BACKOFF_MAX_SECONDS * 5 * (ANAM_MAX_ATTEMPTS - 1) + 1),
+))
+SWEEP_INTERVAL_SECONDS = 5.0
+
+TOKEN_REQUESTS = registry.counter(
+    "anam_token_requests_total", "Session tokens handed out, by source (pool hit, miss or error).", ["result"]
+)
+TIME_TO_TOKEN_SECONDS = registry.histogram(
+    "anam_time_to_token_seconds",
+    "Time from asking for a session token to having one.",
+    ["result"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+TOKENS_MINTED = registry.counter("anam_tokens_minted_total", "Session tokens minted ahead of time by the pool.")
+TOKENS_EXPIRED = registry.counter("anam_tokens_expired_total", "Pre-minted session tokens dropped before use.")
+
+# Live pools, summed by the module's single anam_tokens_ready collector
+_pools: "weakref.WeakSet[SessionTokenPool]" = weakref.WeakSet()
+
+
+def _collect_ready_tokens():
+    ready = sum(pool.ready_count() for pool in list(_pools))
+    return [
+        "# HELP anam_tokens_ready Pre-minted session tokens ready to hand out.",
+        "# TYPE anam_tokens_ready gauge",
+        f"anam_tokens_ready {ready}",
+    ]
+
+
+registry.add_collector(_collect_ready_tokens)
+
+
+@dataclass
+class PooledToken:
+    data: Dict[str, Any]
+    minted_at: float
+    expires_at: float
+
+
+def config_key(payload: Dict[str, Any]) -> str:
+    """Stable key for a persona payload (same config -> same pool)."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+class SessionTokenPool:
+    """
+    Keeps ``size`` fresh Anam session tokens pre-minted per persona config.
+
+    Minting runs on the process-wide background loop, so callers on any thread
+    (Streamlit reruns included) get a ready token without waiting for the API.
+    Each token is handed out once; refills are scheduled right after a token
+    is taken and by a periodic sweep that also drops tokens close to expiry.
+    A miss (empty or disabled pool) falls back to minting on demand.
+    """
+
+    def __init__(
+        self,
+        service: AnamService = anam_service,
+        size: int = ANAM_TOKEN_POOL_SIZE,
+        default_ttl: float = ANAM_TOKEN_TTL_SECONDS,
+        refresh_margin: float = ANAM_TOKEN_REFRESH_MARGIN_SECONDS,
+        idle_seconds: float = ANAM_TOKEN_POOL_IDLE_SECONDS,
+        runner: BackgroundLoop = background_loop,
+    ):
+        self.service = service
+        self.size = size
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.idle_seconds = idle_seconds
+        self._tokens: Dict[str, Deque[PooledToken]] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self._last_used: Dict[str, float] = {}
+        self._refilling: Set[str] = set()
+        self._lock = threading.Lock()
+        self.runner = runner
+        self._sweeper_future: Optional[concurrent.futures.Future] = None
+        self._stats = {"hits": 0, "misses": 0, "errors": 0, "minted": 0, "expired": 0}
+        _pools.add(self)
+
+    # ----------------------------- background loop -----------------------------
+
+    def _ensure_sweeper(self) -> None:
+        with self._lock:
+            if self._sweeper_future is None or self._sweeper_future.done():
+                self._sweeper_future = self.runner.submit(self._sweeper())
+
+    async def _sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+            for key in list(self._payloads):
+                self._schedule_refill(key)
+
+    def _schedule_refill(self, key: str) -> None:
+        """Top the pool for ``key`` up to ``size`` (no-op while a refill is running)."""
+        if self.size <= 0 or not self.service.enabled:
+            return
+        self._ensure_sweeper()
+        with self._lock:
+            self._drop_expiring(key)
+            idle = time.time() - self._last_used.get(key, 0.0) > self.idle_seconds
+            if idle or key in self._refilling or len(self._tokens.get(key, ())) >= self.size:
+                return
+            self._refilling.add(key)
+        self.runner.submit(self._refill(key))
+
+    async def _refill(self, key: str) -> None:
+        try:
+            while True:
+                with self._lock:
+                    missing = self.size - len(self._tokens.setdefault(key, deque()))
+                if missing <= 0:
+                    return
+                results = await asyncio.gather(
+                    *(self.service.request_session_token(self._payloads[key]) for _ in range(missing))
+                )
+                minted = [self._to_pooled(result) for result in results if result.ok]
+                with self._lock:
+                    self._tokens[key].extend(minted)
+                    self._stats["minted"] += len(minted)
+                TOKENS_MINTED.inc(len(minted))
+                if len(minted) < missing:
+                    # The service already retried with backoff; leave the rest to the next sweep
+                    logger.warning(f"Anam token pool refill minted {len(minted)}/{missing} tokens")
+                    return
+        except Exception as e:
+            logger.error(f"Anam token pool refill failed: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def _to_pooled(self, result: SessionTokenResult) -> PooledToken:
+        now = time.time()
+        ttl = (result.data or {}).get("expiresIn")
+        ttl = float(ttl) if isinstance(ttl, (int, float)) and ttl > 0 else self.default_ttl
+        return PooledToken(data=result.data, minted_at=now, expires_at=now + ttl)
+
+    def _drop_expiring(self, key: str) -> None:
+        """Drop tokens within the refresh margin of expiry (caller holds the lock)."""
+        tokens = self._tokens.get(key)
+        if not tokens:
+            return
+        deadline = time.time() + self.refresh_margin
+        fresh = deque(token for token in tokens if token.expires_at > deadline)
+        dropped = len(tokens) - len(fresh)
+        if dropped:
+            self._tokens[key] = fresh
+            self._stats["expired"] += dropped
+            TOKENS_EXPIRED.inc(dropped)
+
+    # ----------------------------- public API -----------------------------
+
+    def warm(self, payload: Dict[str, Any]) -> str:
+        """Register a persona config and start minting tokens for it in the background."""
+        key = config_key(payload)
+        with self._lock:
+            self._payloads.setdefault(key, payload)
+            self._last_used[key] = time.time()
+        self._schedule_refill(key)
+        return key
+
+    def _take(self, payload: Dict[str, Any]) -> Optional[PooledToken]:
+        key = self.warm(payload)
+        with self._lock:
+            self._drop_expiring(key)
+            tokens = self._tokens.get(key)
+            token = tokens.popleft() if tokens else None
+        self._schedule_refill(key)
+        return token
+
+    def _record(self, result: str, start: float) -> None:
+        with self._lock:
+            self._stats[{"hit": "hits", "miss": "misses", "error": "errors"}[result]] += 1
+        TOKEN_REQUESTS.labels(result).inc()
+        TIME_TO_TOKEN_SECONDS.labels(result).observe(time.perf_counter() - start)
+
+    async def aacquire(self, payload: Dict[str, Any]) -> SessionTokenResult:
+        """A pre-minted token if one is ready, otherwise one minted now."""
+        start = time.perf_counter()
+        token = self._take(payload)
+        if token is not None:
+            self._record("hit", start)
+            return SessionTokenResult(data=token.data, attempts=0, extra={"pooled": True})
+        result = await self.service.request_session_token(payload)
+        self._record("miss" if result.ok else "error", start)
+        return result
+
+    def acquire(self, payload: Dict[str, Any], timeout: float = ANAM_ACQUIRE_TIMEOUT_SECONDS) -> SessionTokenResult:
+        """
+        Blocking ``aacquire`` for sync callers; a miss mints on the pool's loop.
+        A mint still running after ``timeout`` seconds is cancelled and reported
+        as a "timeout" error result.
+        """
+        start = time.perf_counter()
+        token = self._take(payload)
+        if token is not None:
+            self._record("hit", start)
+            return SessionTokenResult(data=token.data, attempts=0, extra={"pooled": True})
+        try:
+            result = self.runner.run(self.service.request_session_token(payload), timeout)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"Anam session token not minted within {timeout:g}s")
+            result = SessionTokenResult(error="timeout", message=f"No session token within {timeout:g}s")
+        self._record("miss" if result.ok else "error", start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / served, 3) if served else None,
+                "ready": {
+                    self._payloads[key].get("personaConfig", {}).get("name", key): len(tokens)
+                    for key, tokens in self._tokens.items()
+                },
+                "configs": len(self._payloads),
+            }
+
+    def ready_count(self) -> int:
+        with self._lock:
+            return sum(len(tokens) for tokens in self._tokens.values())
+
+    def close(self) -> None:
+        """Stop refilling and discard pending tokens (the shared loop keeps running)."""
+        with self._lock:
+            sweeper, self._sweeper_future = self._sweeper_future, None
+            self._payloads.clear()
+            self._tokens.clear()
+        if sweeper is not None:
+            sweeper.cancel()
+
+
+# Global pool instance
+session_token_pool = SessionTokenPool()
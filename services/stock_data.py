@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+from services.tool_executor import tool_executor
+from services.ttl_cache import TTLCache
+
+# Configuration
+PRICE_TTL_SECONDS = float(os.getenv("STOCK_PRICE_TTL_SECONDS", "15"))
+COMPANY_INFO_TTL_SECONDS = float(os.getenv("STOCK_INFO_TTL_SECONDS", str(6 * 3600)))
+
+
+class YFinanceDataSource:
+    """Live data from Yahoo Finance."""
+
+    def get_prices(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        """Latest close for every ticker, fetched in one ``yf.download`` call."""
+        import yfinance as yf
+
+        data = yf.download(tickers, period="1d", progress=False, auto_adjust=False, threads=True)
+        if data is None or data.empty:
+            return {ticker: None for ticker in tickers}
+
+        close = data["Close"]
+        if getattr(close, "ndim", 1) == 1:  # Older yfinance: single ticker gives a Series
+            close = close.to_frame(tickers[0])
+
+        prices: Dict[str, Optional[float]] = {}
+        for ticker in tickers:
+            series = close[ticker].dropna() if ticker in close.columns else None
+            prices[ticker] = float(series.iloc[-1]) if series is not None and not series.empty else None
+        return prices
+
+    def get_company_info(self, ticker: str) -> Dict[str, Any]:
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info
+
+
+class StubStockDataSource:
+    """Local, deterministic data source for tests and benchmarks; counts upstream calls."""
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, float]] = None,
+        company_info: Optional[Dict[str, Dict[str, Any]]] = None,
+        delay: float = 0.0,
+    ):
+        self.prices = prices or {}
+        self.company_info = company_info or {}
+        self.delay = delay
+        self.price_calls = 0
+        self.info_calls = 0
+        self._lock = threading.Lock()
+
+    def get_prices(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        with self._lock:
+            self.price_calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return {ticker: self.prices.get(ticker) for ticker in tickers}
+
+    def get_company_info(self, ticker: str) -> Dict[str, Any]:
+        with self._lock:
+            self.info_calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.company_info.get(ticker, {})
+
+
+class StockDataService:
+    """Cached, single-flight access to stock prices and company profiles."""
+
+    def __init__(
+        self,
+        source: Any = None,
+        price_ttl: float = PRICE_TTL_SECONDS,
+        info_ttl: float = COMPANY_INFO_TTL_SECONDS,
+        cache: Optional[TTLCache] = None,
+    ):
+        self.source = source or YFinanceDataSource()
+        self.price_ttl = price_ttl
+        self.info_ttl = info_ttl
+        self.cache = cache or TTLCache()
+
+    def get_prices(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        """Prices for several tickers; cache misses are fetched together in one upstream call."""
+        symbols = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+        keys = [("price", symbol) for symbol in symbols]
+        loaded = self.cache.get_many_or_load(
+            keys,
+            lambda missing: {
+                ("price", symbol): price
+                for symbol, price in self.source.get_prices([key[1] for key in missing]).items()
+            },
+            self.price_ttl,
+        )
+        return {symbol: loaded.get(("price", symbol)) for symbol in symbols}
+
+    def get_price(self, ticker: str) -> Optional[float]:
+        return self.get_prices([ticker]).get(ticker.strip().upper())
+
+    def get_company_info(self, ticker: str) -> Dict[str, Any]:
+        symbol = ticker.strip().upper()
+        return self.cache.get_or_load(
+            ("info", symbol),
+            lambda: self.source.get_company_info(symbol) or None,
+            self.info_ttl,
+        ) or {}
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+# Global service instance
+stock_data_service = StockDataService()
+# Hit rates on /metrics, next to the latency of the tools that read through this cache
+tool_executor.metrics.register_cache(
+    "stock_data", stock_data_service.stats, ["get_stock_price", "get_stock_prices", "get_company_info"]
+)
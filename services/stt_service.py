@@ -0,0 +1,197 @@
+import os
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import numpy as np
+from loguru import logger
+from services.metrics import STT_UTTERANCES
+
+# Configuration
+STT_ENGINE = os.getenv("STT_ENGINE", "google")
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", "8"))
+STT_MAX_WORKERS = int(os.getenv("STT_MAX_WORKERS", "4"))
+WHISPER_MODEL = os.getenv("STT_WHISPER_MODEL", "tiny.en")
+
+
+@dataclass
+class TranscriptionResult:
+    """Outcome of one utterance. ``error`` is set instead of silently returning an empty string."""
+
+    text: str
+    latency: float
+    engine: str
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class STTEngine(ABC):
+    """Backend interface. Engines receive mono int16 PCM at (ideally) their native rate."""
+
+    name: str = "base"
+    sample_rate: int = 16000
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        """Return the transcript, or "" when no speech was recognized. Raise on failure."""
+
+
+class GoogleSTTEngine(STTEngine):
+    """SpeechRecognition's free Google Web Speech endpoint (network)."""
+
+    name = "google"
+    sample_rate = 16000
+
+    def __init__(self, timeout: float = STT_TIMEOUT_SECONDS):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        # Bounds the HTTP request itself: a hung request would otherwise hold an STT worker
+        # forever, since the service's timeout cannot stop a thread that is already running
+        self.recognizer.operation_timeout = timeout
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        audio_data = self._sr.AudioData(audio.tobytes(), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio_data)
+        except self._sr.UnknownValueError:
+            return ""
+
+
+class WhisperSTTEngine(STTEngine):
+    """Offline, CPU-only engine using faster-whisper with int8 weights (optional dependency)."""
+
+    name = "whisper"
+    sample_rate = 16000
+
+    def __init__(self, model_name: str = WHISPER_MODEL):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "STT_ENGINE=whisper requires the faster-whisper package: pip install faster-whisper"
+            ) from e
+        self.model = WhisperModel(model_name, device="cpu", compute_type="int8")
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        if sample_rate != self.sample_rate:
+            raise ValueError(f"Whisper expects {self.sample_rate} Hz audio, got {sample_rate} Hz")
+        samples = audio.astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, beam_size=1, vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class FakeSTTEngine(STTEngine):
+    """
+    Deterministic engine for tests and benchmarks.
+
+    Returns the scripted transcripts in order (cycling), after an optional fixed
+    delay. A transcript of ``None`` raises, to exercise failure handling.
+    """
+
+    name = "fake"
+    sample_rate = 16000
+
+    def __init__(self, transcripts: Iterable[Optional[str]] = ("hello",), delay: float = 0.0):
+        self.transcripts = list(transcripts)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        with self._lock:
+            text = self.transcripts[self.calls % len(self.transcripts)]
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if text is None:
+            raise RuntimeError("fake STT failure")
+        return text
+
+
+ENGINES = {
+    "google": GoogleSTTEngine,
+    "whisper": WhisperSTTEngine,
+    "fake": FakeSTTEngine,
+}
+
+
+def create_engine(name: str = STT_ENGINE) -> STTEngine:
+    try:
+        engine_cls = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown STT engine '{name}'. Choose one of: {', '.join(ENGINES)}")
+    return engine_cls()
+
+
+class STTService:
+    """Runs an STT engine on a bounded thread pool with a per-utterance timeout and outcome metrics."""
+
+    def __init__(
+        self,
+        engine: Optional[STTEngine] = None,
+        timeout: float = STT_TIMEOUT_SECONDS,
+        max_workers: int = STT_MAX_WORKERS,
+    ):
+        self._engine = engine
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt")
+
+    @property
+    def engine(self) -> STTEngine:
+        if self._engine is None:
+            self._engine = create_engine()
+            logger.info(f"STT engine: {self._engine.name}")
+        return self._engine
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> TranscriptionResult:
+        """Transcribe one utterance from a sync caller (e.g. the FastRTC handler thread)."""
+        engine = self.engine
+        start = time.perf_counter()
+        future = self._executor.submit(engine.transcribe, audio, sample_rate)
+        try:
+            text = future.result(timeout=self.timeout)
+            error = None
+        except FutureTimeoutError:
+            future.cancel()
+            text, error = "", f"timed out after {self.timeout:.1f}s"
+        except Exception as e:
+            text, error = "", f"{type(e).__name__}: {e}"
+        return self._record(engine, text, error, time.perf_counter() - start)
+
+    async def atranscribe(self, audio: np.ndarray, sample_rate: int) -> TranscriptionResult:
+        """Transcribe one utterance without blocking the event loop."""
+        engine = self.engine
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            text = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, engine.transcribe, audio, sample_rate),
+                timeout=self.timeout,
+            )
+            error = None
+        except asyncio.TimeoutError:
+            text, error = "", f"timed out after {self.timeout:.1f}s"
+        except Exception as e:
+            text, error = "", f"{type(e).__name__}: {e}"
+        return self._record(engine, text, error, time.perf_counter() - start)
+
+    def _record(self, engine, text, error, latency) -> TranscriptionResult:
+        if error:
+            outcome = "timeout" if error.startswith("timed out") else "error"
+            logger.warning(f"STT ({engine.name}) failed after {latency:.2f}s: {error}")
+        else:
+            outcome = "ok" if text.strip() else "empty"
+        STT_UTTERANCES.labels(engine.name, outcome).inc()
+        return TranscriptionResult(text=text or "", latency=latency, engine=engine.name, error=error)
+
+
+# Global service instance
+stt_service = STTService()
@@ -0,0 +1,257 @@
+import os
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+from services.metrics import registry, tool_metrics_collector
+from services.tool_metrics import ToolMetrics
+
+# langchain_core is imported where it is used: app.py and backend.py import this
+# module for collect()/format_tool_timings long before the first tool call
+if TYPE_CHECKING:
+    from langchain_core.messages import ToolMessage
+    from langchain_core.tools import BaseTool
+
+# Configuration
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "15"))
+# Scraping a Kayak results page routinely takes longer than an API call
+DEFAULT_TOOL_TIMEOUTS = {
+    "search_flights": 40.0,
+    "search_hotels": 40.0,
+}
+# Total tool time allowed per turn; once spent, further calls get a fallback right away
+TOOL_TURN_BUDGET_SECONDS = float(os.getenv("TOOL_TURN_BUDGET_SECONDS", "25"))
+
+
+@dataclass
+class ToolTiming:
+    name: str
+    seconds: float
+    status: str  # "ok", "error", "timeout" or "fallback"
+
+
+@dataclass
+class _Turn:
+    timings: List[ToolTiming]
+    deadline: float  # time.perf_counter() value
+
+
+# The turn the current tool calls belong to (see ToolExecutor.collect)
+_current_turn: contextvars.ContextVar[Optional[_Turn]] = contextvars.ContextVar(
+    "tool_current_turn", default=None
+)
+
+
+def format_tool_timings(timings: List[ToolTiming]) -> str:
+    """``get_weather=0.42s, search_flights=40.00s(timeout)`` for the ⚡ Performance line."""
+    return ", ".join(
+        f"{t.name}={t.seconds:.2f}s" + ("" if t.status == "ok" else f"({t.status})")
+        for t in timings
+    )
+
+
+def _is_async_tool(tool: "BaseTool") -> bool:
+    """
+    True when the tool has a native coroutine (e.g. the weather tool), so it can be
+    awaited and cancelled. ``@tool`` functions are StructuredTools, whose ``_arun``
+    only hands a sync function to the loop's default executor; those count as blocking.
+    """
+    from langchain_core.tools import BaseTool, StructuredTool, Tool
+
+    if getattr(tool, "coroutine", None) is not None:
+        return True
+    return type(tool)._arun not in (BaseTool._arun, StructuredTool._arun, Tool._arun)
+
+
+class ToolExecutor:
+    """
+    Runs the tool calls of one agent step concurrently, each under a timeout,
+    and records per-tool latency and outcomes.
+
+    Plugged into LangGraph's ToolNode as ``wrap_tool_call`` / ``awrap_tool_call``,
+    so the tool calls the model requests together run side by side instead of
+    one after another. Blocking tools run in a bounded thread pool; async tools
+    are awaited on the caller's loop and cancelled when they time out. A tool
+    that times out gives the agent an error ToolMessage instead of stalling the
+    turn (a blocking tool cannot be interrupted; its thread finishes in the
+    background and the result is discarded).
+
+    Within a turn (``collect()``) every call is also capped by what is left of
+    the turn's latency budget; when it is spent the agent gets a fallback
+    result immediately.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = TOOL_MAX_WORKERS,
+        timeout: float = TOOL_TIMEOUT_SECONDS,
+        timeouts: Optional[Dict[str, float]] = None,
+        turn_budget: float = TOOL_TURN_BUDGET_SECONDS,
+        metrics: Optional[ToolMetrics] = None,
+    ):
+        self.timeout = timeout
+        self.timeouts = dict(DEFAULT_TOOL_TIMEOUTS if timeouts is None else timeouts)
+        self.turn_budget = turn_budget
+        self.metrics = metrics or ToolMetrics()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        # id(tool) -> (tool, copy that runs in self._pool); the original is kept to pin its id
+        self._pooled_tools: Dict[int, Tuple["BaseTool", "BaseTool"]] = {}
+
+    def timeout_for(self, name: str) -> float:
+        """The tool's own timeout, capped by what is left of the current turn's budget."""
+        timeout = self.timeouts.get(name, self.timeout)
+        turn = _current_turn.get()
+        if turn is not None:
+            timeout = min(timeout, turn.deadline - time.perf_counter())
+        return timeout
+
+    @contextmanager
+    def collect(self, budget: Optional[float] = None) -> Iterator[List[ToolTiming]]:
+        """
+        Mark one agent turn: tool calls inside this block share its latency
+        budget and their timings are collected (propagates to worker threads and tasks).
+        """
+        budget = self.turn_budget if budget is None else budget
+        turn = _Turn(timings=[], deadline=time.perf_counter() + budget)
+        token = _current_turn.set(turn)
+        try:
+            yield turn.timings
+        finally:
+            try:
+                _current_turn.reset(token)
+            except ValueError:
+                # An abandoned async generator can be finalized from another context
+                _current_turn.set(None)
+
+    # ----------------------------- ToolNode wrappers -----------------------------
+
+    def wrap(self, request: Any, execute: Callable[[Any], Any]) -> Any:
+        """Sync ToolNode wrapper (agent.invoke); ToolNode already fans the calls out over threads."""
+        name = request.tool_call["name"]
+        timeout = self.timeout_for(name)
+        start = time.perf_counter()
+        if timeout <= 0:
+            return self._fallback(request, start)
+        future = self._pool.submit(contextvars.copy_context().run, execute, request)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return self._timed_out(request, timeout, start)
+        except Exception:
+            self._record(name, start, "error")
+            raise
+        self._record(name, start, self._status(result))
+        return result
+
+    async def awrap(self, request: Any, execute: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Async ToolNode wrapper (astream_events/ainvoke); ToolNode gathers the calls of one step."""
+        name = request.tool_call["name"]
+        tool = request.tool
+        timeout = self.timeout_for(name)
+        start = time.perf_counter()
+        if timeout <= 0:
+            return self._fallback(request, start)
+
+        if tool is not None and not _is_async_tool(tool):
+            # Blocking tools run in our bounded pool, not the loop's default executor;
+            # ToolNode still injects arguments, validates them and handles tool errors
+            request = request.override(tool=self._pooled(tool))
+        pending = execute(request)
+
+        try:
+            result = await asyncio.wait_for(pending, timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(request, timeout, start)
+        except Exception:
+            self._record(name, start, "error")
+            raise
+        self._record(name, start, self._status(result))
+        return result
+
+    # ----------------------------- helpers -----------------------------
+
+    def _pooled(self, tool: "BaseTool") -> "BaseTool":
+        """A copy of a blocking tool whose coroutine runs the tool's ``_run`` in ``self._pool``."""
+        cached = self._pooled_tools.get(id(tool))
+        if cached is not None and cached[0] is tool:
+            return cached[1]
+        if not hasattr(tool, "coroutine"):
+            # A BaseTool subclass with only _run: LangChain runs it in the loop's default executor
+            return tool
+
+        from langchain_core.runnables import RunnableConfig
+
+        pool = self._pool
+
+        async def run_in_pool(*args: Any, config: RunnableConfig, **kwargs: Any) -> Any:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, contextvars.copy_context().run, partial(tool._run, *args, config=config, **kwargs)
+            )
+
+        pooled = tool.model_copy(update={"coroutine": run_in_pool})
+        self._pooled_tools[id(tool)] = (tool, pooled)
+        return pooled
+
+    @staticmethod
+    def _status(result: Any) -> str:
+        return "error" if getattr(result, "status", "success") == "error" else "ok"
+
+    def _timed_out(self, request: Any, timeout: float, start: float) -> "ToolMessage":
+        name = request.tool_call["name"]
+        self._record(name, start, "timeout")
+        logger.warning(f"Tool {name} timed out after {timeout:.1f}s")
+        return self._error_message(
+            request,
+            f"The {name} tool did not respond within {timeout:.1f} seconds. "
+            f"Answer without it or suggest trying again later.",
+        )
+
+    def _fallback(self, request: Any, start: float) -> "ToolMessage":
+        name = request.tool_call["name"]
+        self._record(name, start, "fallback")
+        logger.warning(f"Tool {name} skipped: turn latency budget spent")
+        return self._error_message(
+            request,
+            f"The {name} tool was skipped because this answer is already taking too long. "
+            f"Answer with what you have and offer to look it up again.",
+        )
+
+    @staticmethod
+    def _error_message(request: Any, content: str) -> "ToolMessage":
+        from langchain_core.messages import ToolMessage
+
+        return ToolMessage(
+            content=content,
+            name=request.tool_call["name"],
+            tool_call_id=request.tool_call["id"],
+            status="error",
+        )
+
+    def _record(self, name: str, start: float, status: str) -> None:
+        seconds = time.perf_counter() - start
+        self.metrics.record(name, seconds, status)
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.timings.append(ToolTiming(name, seconds, status))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "turn_budget_seconds": self.turn_budget,
+            "default_timeout_seconds": self.timeout,
+            **self.metrics.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global executor instance; its per-tool series are registered once per process
+tool_executor = ToolExecutor()
+registry.add_collector(tool_metrics_collector(tool_executor))
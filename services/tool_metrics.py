@@ -0,0 +1,99 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Upper bounds (seconds) of the latency buckets, from cached lookups up to Kayak scrapes
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus-style ``le`` buckets)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (an upper estimate)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": cumulative,
+        }
+
+
+class ToolMetrics:
+    """Thread-safe per-tool latency, outcome and cache statistics."""
+
+    OUTCOMES = ("ok", "error", "timeout", "fallback")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._caches: Dict[str, Dict[str, Any]] = {}
+
+    def register_cache(self, cache_name: str, stats: Callable[[], Dict[str, Any]], tools: List[str]) -> None:
+        """Report a cache's ``stats()`` (hits, misses, ...) alongside the tools that read through it."""
+        self._caches[cache_name] = {"stats": stats, "tools": list(tools)}
+
+    def record(self, tool_name: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            histogram = self._latency.get(tool_name)
+            if histogram is None:
+                histogram = self._latency[tool_name] = LatencyHistogram()
+                self._outcomes[tool_name] = dict.fromkeys(self.OUTCOMES, 0)
+            # Fallbacks never ran the tool; keep them out of the latency distribution
+            if outcome != "fallback":
+                histogram.observe(seconds)
+            self._outcomes[tool_name][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            tools = {
+                name: {"calls": dict(self._outcomes[name]), "latency": histogram.snapshot()}
+                for name, histogram in self._latency.items()
+            }
+        caches = {}
+        for name, cache in self._caches.items():
+            try:
+                stats = cache["stats"]()
+            except Exception as e:
+                stats = {"error": str(e)}
+            caches[name] = {"tools": cache["tools"], **stats}
+        return {"tools": tools, "caches": caches}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._outcomes.clear()
@@ -0,0 +1,228 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+# Rows returned to the LLM; the cheapest options are usually all it needs
+MAX_ROWS = 8
+FALLBACK_CHARS = 1200
+
+PRICE = re.compile(r"(?:US\$|\$|€|£|₹)\s?\d[\d,]*(?:\.\d{2})?")
+TIME = re.compile(r"\b\d{1,2}:\d{2}\s?(?:[ap]\.?m\.?)?", re.IGNORECASE)
+DURATION = re.compile(r"\b\d{1,2}h(?:\s?\d{1,2}m)?\b")
+STOPS = re.compile(r"\b(nonstop|direct|\d\+? stops?)\b", re.IGNORECASE)
+RATING = re.compile(
+    r"\b(\d{1,2}(?:\.\d)?)\s*(?:/\s*10\s*)?(exceptional|wonderful|superb|fabulous|excellent|"
+    r"very good|good|pleasant|okay)\b",
+    re.IGNORECASE,
+)
+STARS = re.compile(r"\b([1-5])[- ]stars?\b", re.IGNORECASE)
+NIGHTLY = re.compile(r"(?:\bper|/|\ba)\s?night\b|\bnightly\b", re.IGNORECASE)
+
+MD_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+MD_NOISE = re.compile(r"[#*_>`|]+")
+
+# Lines that are UI chrome rather than names of airlines or hotels. Matched against
+# the whole line, so names that merely contain a label word ("Best Western Plus",
+# "Grand Total Suites") are kept while "Best", "View deal" or "1.2 km from center" go.
+UI_LABEL = re.compile(
+    r"[\s:,\-–()/]*(?:(?:view deal|select|sort(?: by)?|filter|price|per night|total|deal|book(?: now)?|"
+    r"sign in|show more(?: results)?|cheapest|best|quickest|flexible|reviews?|map|free cancellation|"
+    r"sponsored|ad|results?|from|city|cent(?:er|re)|km|mi|miles?|\d[\d.,+]*)(?:[\s:,\-–()/]+|$))+",
+    re.IGNORECASE,
+)
+
+
+def clean_lines(markdown: str) -> List[str]:
+    """Plain-text lines from scraped markdown: images dropped, links reduced to their text."""
+    text = MD_IMAGE.sub(" ", markdown)
+    text = MD_LINK.sub(r"\1", text)
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(MD_NOISE.sub(" ", line).split())
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _price_value(price: str) -> float:
+    try:
+        return float(re.sub(r"[^\d.]", "", price))
+    except ValueError:
+        return float("inf")
+
+
+def _is_name(line: str) -> bool:
+    """A short line of words that is not a price, time, rating or UI label."""
+    if len(line) > 60 or len(line) < 2 or not re.search(r"[A-Za-z]{2}", line):
+        return False
+    if PRICE.search(line) or TIME.search(line) or DURATION.search(line) or STOPS.search(line):
+        return False
+    if RATING.search(line) or STARS.search(line) or UI_LABEL.fullmatch(line):
+        return False
+    # Airport pairs such as "JFK-LAX" and date labels are not names
+    return not re.fullmatch(r"[A-Z]{3}\s?[-–]\s?[A-Z]{3}", line)
+
+
+def _segments(lines: Sequence[str]) -> List[List[str]]:
+    """Split the page into result cards; each card ends at the line carrying its price."""
+    segments: List[List[str]] = []
+    current: List[str] = []
+    for line in lines:
+        current.append(line)
+        if PRICE.search(line):
+            segments.append(current)
+            current = []
+    return segments
+
+
+def _dedupe(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    seen = set()
+    unique = []
+    for row in rows:
+        key = tuple(sorted(row.items()))
+        if key not in seen:
+            seen.add(key)
+            unique.append(row)
+    return unique
+
+
+def extract_flights(markdown: str) -> List[Dict[str, str]]:
+    """Flight rows (price, airline, depart, arrive, duration, stops) found in a Kayak results page."""
+    rows = []
+    for segment in _segments(clean_lines(markdown)):
+        # Only look at the tail of a long segment so headers and filters do not leak in
+        segment = segment[-12:]
+        text = " ".join(segment)
+        times = TIME.findall(text)
+        if len(times) < 2:
+            continue
+        names = [line for line in segment if _is_name(line)]
+        duration = DURATION.search(text)
+        stops = STOPS.search(text)
+        rows.append({
+            "price": PRICE.findall(segment[-1])[0],
+            "airline": names[-1] if names else "",
+            "depart": times[0].strip(),
+            "arrive": times[1].strip(),
+            "duration": duration.group(0) if duration else "",
+            "stops": stops.group(0).lower() if stops else "",
+        })
+    return sorted(_dedupe(rows), key=lambda row: _price_value(row["price"]))[:MAX_ROWS]
+
+
+def _hotel_cue(line: str) -> bool:
+    """A review score, star class or nightly price: what sets a hotel card apart from flights and chrome."""
+    return bool(RATING.search(line) or STARS.search(line) or NIGHTLY.search(line))
+
+
+def extract_hotels(markdown: str) -> List[Dict[str, str]]:
+    """Hotel rows (price, hotel, rating, stars) found in a Kayak results page."""
+    rows = []
+    for segment in _segments(clean_lines(markdown)):
+        segment = segment[-10:]
+        cues = [i for i, line in enumerate(segment) if _hotel_cue(line)]
+        if not cues:
+            # Flight cards, ads and page chrome also end in a price line
+            continue
+        # The hotel name sits just above its first rating/stars/nightly line
+        names = [line for line in segment[:cues[0]] if _is_name(line)]
+        names = names or [line for line in segment if _is_name(line)]
+        if not names:
+            continue
+        text = " ".join(segment)
+        rating = RATING.search(text)
+        stars = STARS.search(text)
+        rows.append({
+            "price": PRICE.findall(segment[-1])[0],
+            "hotel": names[-1],
+            "rating": f"{rating.group(1)} {rating.group(2).title()}" if rating else "",
+            "stars": f"{stars.group(1)}★" if stars else "",
+        })
+    # The same hotel often appears with several providers; keep its cheapest offer
+    cheapest: Dict[str, Dict[str, str]] = {}
+    for row in sorted(rows, key=lambda row: _price_value(row["price"])):
+        cheapest.setdefault(row["hotel"].lower(), row)
+    return list(cheapest.values())[:MAX_ROWS]
+
+
+def format_table(rows: Sequence[Dict[str, str]], columns: Optional[Sequence[str]] = None) -> str:
+    """Compact pipe-separated table; empty columns are dropped."""
+    if not rows:
+        return ""
+    columns = [c for c in (columns or list(rows[0])) if any(row.get(c) for row in rows)]
+    lines = [" | ".join(c.title() for c in columns)]
+    for row in rows:
+        lines.append(" | ".join(row.get(c, "") or "-" for c in columns))
+    return "\n".join(lines)
+
+
+def fallback_excerpt(markdown: str, limit: int = FALLBACK_CHARS) -> str:
+    """Cleaned page text for when no result rows could be recognised."""
+    text = "\n".join(clean_lines(markdown))
+    return text[:limit]
+
+
+# Scraped pages with the rows they must yield (run this module to check them)
+REGRESSION_CASES = [
+    (
+        "hotel names containing UI words",
+        """Sort by: Best
+Map
+Best Western Plus Downtown
+8.4 Excellent (1,234 reviews)
+View Deal
+$129 per night
+Grand Total Suites
+3-star hotel
+$98 /night""",
+        {"hotels": ["Grand Total Suites", "Best Western Plus Downtown"], "flights": []},
+    ),
+    (
+        "mixed page with a flight card and app chrome",
+        """# KAYAK
+Stays in Chicago
+Sort by: Recommended
+## United Airlines
+7:05 am – 9:40 am
+ORD-LGA
+2h 35m nonstop
+$189
+## Best Western Plus Downtown
+8.4 Excellent (1,234 reviews)
+3-star hotel
+1.2 km from city center
+View Deal
+$129 per night
+Hilton Garden Inn
+4 stars
+9.0 Superb
+$159 /night
+Sponsored
+Get the KAYAK app
+$0 booking fees""",
+        {"hotels": ["Best Western Plus Downtown", "Hilton Garden Inn"], "flights": ["United Airlines"]},
+    ),
+]
+
+
+def check_regressions() -> List[str]:
+    """Run REGRESSION_CASES through both extractors; returns the failures."""
+    failures = []
+    for label, markdown, expected in REGRESSION_CASES:
+        found = {
+            "hotels": [row["hotel"] for row in extract_hotels(markdown)],
+            "flights": [row["airline"] for row in extract_flights(markdown)],
+        }
+        for kind, names in found.items():
+            if names != expected[kind]:
+                failures.append(f"{label}: {kind} {names!r}, expected {expected[kind]!r}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_regressions()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(REGRESSION_CASES)} regression cases, {len(failures)} failures")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,158 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with single-flight loading.
+
+    Each entry carries its own freshness window, so one cache can serve tools
+    with different policies (seconds for prices, hours for company profiles).
+    Concurrent lookups of the same missing key share one loader call; loader
+    errors are propagated to every waiter and never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "loads": 0, "errors": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value or None (does not count as a lookup)."""
+        with self._lock:
+            return self._fresh(key)
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float) -> Any:
+        """Return the cached value for ``key``, or load it once for all concurrent callers."""
+        with self._lock:
+            value = self._fresh(key)
+            if value is not None:
+                self._counters["hits"] += 1
+                return value
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                owner = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._counters["misses"] += 1
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._counters["errors"] += 1
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._counters["loads"] += 1
+            if value is not None:
+                self._store(key, value, ttl)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def get_many_or_load(
+        self,
+        keys: Iterable[Hashable],
+        batch_loader: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        ttl: float,
+    ) -> Dict[Hashable, Any]:
+        """
+        Resolve several keys, fetching every missing one in a single ``batch_loader`` call.
+
+        Keys already being loaded by another caller are awaited instead of re-fetched.
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, Future] = {}
+        owned: Dict[Hashable, Future] = {}
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value = self._fresh(key)
+                if value is not None:
+                    self._counters["hits"] += 1
+                    results[key] = value
+                elif key in self._inflight:
+                    self._counters["coalesced"] += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self._counters["misses"] += 1
+                    owned[key] = self._inflight[key] = Future()
+
+        if owned:
+            try:
+                loaded = batch_loader(list(owned))
+            except BaseException as e:
+                with self._lock:
+                    self._counters["errors"] += 1
+                    for key in owned:
+                        del self._inflight[key]
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+            with self._lock:
+                self._counters["loads"] += 1
+                for key in owned:
+                    value = loaded.get(key)
+                    if value is not None:
+                        self._store(key, value, ttl)
+                    del self._inflight[key]
+            for key, future in owned.items():
+                results[key] = loaded.get(key)
+                future.set_result(loaded.get(key))
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return results
+
+    def record(self, counter: str) -> None:
+        """Count a lookup resolved outside ``get_or_load`` (e.g. by an async caller)."""
+        with self._lock:
+            self._counters[counter] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        return stats
+
+    # Callers hold self._lock
+    def _fresh(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
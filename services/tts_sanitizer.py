@@ -0,0 +1,247 @@
+import re
+import time
+from typing import Callable, Iterable, List
+
+# Longest markdown link/image we wait for before giving up and speaking it as text
+MAX_PENDING_LINK_CHARS = 300
+
+_LINK = re.compile(r"!?\[([^\]\n]*)\]\(([^)\s]*)\)")
+_URL = re.compile(r"\b(?:https?://|www\.)([\w.-]+)[^\s)\]]*", re.IGNORECASE)
+# Markdown block markers at the start of a line: headings, bullets, quotes, rules
+_LINE_MARKERS = re.compile(r"(?m)^[ \t]*(?:#{1,6}[ \t]+|[-*+•][ \t]+|>[ \t]?|(?:[-*_][ \t]*){3,}$)")
+# "10-20" / "10 – 20" read as a range; only standalone numbers on both sides, so
+# ISO dates (2025-01-15), IDs and chains (1-2-3) are left alone. A spaced hyphen is subtraction.
+_NUMBER_RANGE = re.compile(
+    r"(?<![\w\-–.])(\d{1,4}(?:\.\d+)?)(?:-|[ \t]?–[ \t]?)(\d{1,4}(?:\.\d+)?)(?![\d\-–]|\.\d)"
+)
+# 555-1234 style phone numbers look like ranges but are read digit group by digit group
+_PHONE_LIKE = re.compile(r"\d{3}-\d{4}")
+_DASHES = re.compile(r"-{2,}|—|–")
+_SYMBOLS = re.compile(r"[ \t]*(%|°C|°F|°)|[ \t]*(&|~)[ \t]*")
+_SYMBOL_WORDS = {
+    "%": " percent", "°C": " degrees Celsius", "°F": " degrees Fahrenheit", "°": " degrees",
+    "&": " and ", "~": " about ",
+}
+# A line break after a word becomes a sentence break so TTS pauses between list items
+_LINE_BREAK_AFTER_WORD = re.compile(r"(?<=[^\s.!?,:;])[ \t]*\n\s*")
+_WHITESPACE = re.compile(r"\s+")
+# Anything _clean_segment would change besides whitespace; most words contain none of it
+_NEEDS_CLEANING = re.compile(r"[\[\]*#`~_|%&°>+•\n\-–—]|https?:|www\.", re.IGNORECASE)
+
+# Emphasis/code markers are dropped; underscores and table pipes become spaces
+_CHAR_TABLE = str.maketrans({"*": None, "#": None, "`": None, "~": None, "_": " ", "|": " "})
+
+_SENTENCE_PUNCTUATION = ".!?,:;"
+_WHITESPACE_CHARS = " \t\n\r"
+
+
+def _number_range(match: "re.Match") -> str:
+    if _PHONE_LIKE.fullmatch(match.group(0)):
+        return match.group(0)
+    return f"{match.group(1)} to {match.group(2)}"
+
+
+def _clean_segment(text: str) -> str:
+    """All transformations for one complete run of text (never split mid-token)."""
+    text = _LINK.sub(r"\1", text)
+    text = _URL.sub(lambda m: m.group(1).rstrip("."), text)
+    text = _LINE_MARKERS.sub("", text)
+    text = _NUMBER_RANGE.sub(_number_range, text)
+    text = _DASHES.sub(" ", text)
+    text = _SYMBOLS.sub(lambda m: _SYMBOL_WORDS[m.group(1) or m.group(2)], text)
+    text = text.translate(_CHAR_TABLE)
+    text = _LINE_BREAK_AFTER_WORD.sub(". ", text)
+    return _WHITESPACE.sub(" ", text)
+
+
+class TTSSanitizer:
+    """
+    Streaming markdown-to-speech cleaner.
+
+    ``feed()`` takes raw LLM chunks and returns text that is safe to speak now.
+    The trailing partial word is held back until the next chunk (so ``**``,
+    numbers or URLs split across chunks are cleaned as one token), as is an
+    unfinished ``[link](url)``. Spaces between tokens are preserved; runs of
+    whitespace collapse across chunk boundaries. ``flush()`` returns the rest.
+
+    Links and images are read as their text, bare URLs as their domain,
+    headings/bullets/quotes/rules and emphasis/code markers are dropped,
+    number ranges read as "10 to 20", and %, &, ° and ~ become words.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        # Last raw character already processed; "\\n" means we are at a line start
+        self._prev = "\n"
+        self._out_space = True  # Output so far ends with a space (or nothing was spoken yet)
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        cut = self._safe_cut()
+        if cut <= 0:
+            return ""
+        segment, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._emit(segment)
+
+    def flush(self) -> str:
+        segment, self._buffer = self._buffer, ""
+        text = self._emit(segment) if segment else ""
+        self._prev, self._out_space = "\n", True
+        return text.rstrip()
+
+    # ----------------------------- internals -----------------------------
+
+    def _safe_cut(self) -> int:
+        """Length of the buffer prefix that can be cleaned without seeing more input."""
+        buffer = self._buffer
+        cut = max(buffer.rfind(" "), buffer.rfind("\n"), buffer.rfind("\t")) + 1
+
+        # Never cut inside a link or image: hold it back from its opening bracket
+        start = buffer.rfind("[", 0, cut)
+        if start >= 0 and len(buffer) - start < MAX_PENDING_LINK_CHARS and self._link_end(buffer, start) > cut:
+            if start > 0 and buffer[start - 1] == "!":
+                start -= 1
+            cut = start
+        return cut
+
+    @staticmethod
+    def _link_end(buffer: str, start: int) -> int:
+        """End of the ``[text](url)`` starting at ``start``; past the buffer if unfinished, -1 if not a link."""
+        close = buffer.find("]", start)
+        if close < 0 or close == len(buffer) - 1:
+            return len(buffer) + 1
+        if buffer[close + 1] != "(":
+            return -1
+        paren = buffer.find(")", close)
+        return len(buffer) + 1 if paren < 0 else paren + 1
+
+    def _emit(self, segment: str) -> str:
+        # Process with one character of left context so line starts, ranges and
+        # line breaks see what came before; the context's output is dropped again
+        prev = self._prev
+        if prev in _WHITESPACE_CHARS:
+            context = "\n" if prev == "\n" else " "
+        elif prev in _SENTENCE_PUNCTUATION or prev.isdigit():
+            context = prev
+        else:
+            context = "a"
+        self._prev = segment[-1]
+
+        text = context + segment
+        if _NEEDS_CLEANING.search(text):
+            text = _clean_segment(text)
+        elif "  " in text or "\t" in text or "\r" in text:
+            text = _WHITESPACE.sub(" ", text)
+        text = text[1:]
+        if self._out_space:
+            text = text.lstrip(" ")
+        if text:
+            self._out_space = text.endswith(" ")
+        return text
+
+
+def clean_text_for_tts(text: str) -> str:
+    """Clean a complete reply (or sentence) for TTS."""
+    sanitizer = TTSSanitizer()
+    return (sanitizer.feed(text) + sanitizer.flush()).strip()
+
+
+def sanitize_stream(chunks: Iterable[str]) -> Iterable[str]:
+    """Yield cleaned text for a stream of raw chunks (empty pieces skipped)."""
+    sanitizer = TTSSanitizer()
+    for chunk in chunks:
+        text = sanitizer.feed(chunk)
+        if text:
+            yield text
+    text = sanitizer.flush()
+    if text:
+        yield text
+
+
+# ----------------------------- benchmark -----------------------------
+
+def _legacy_clean_text_for_tts(text: str) -> str:
+    """The per-chunk cleaner previously duplicated in app.py and backend.py (benchmark baseline)."""
+    clean_text = text
+    clean_text = re.sub(r'\*+', '', clean_text)
+    clean_text = re.sub(r'[#_`]', '', clean_text)
+    clean_text = re.sub(r'-{2,}', ' ', clean_text)
+    clean_text = re.sub(r'\|', ' ', clean_text)
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+    return clean_text
+
+
+SAMPLE_PLAIN = (
+    "Sure! It's a mild evening in Paris, around eighteen degrees with a light breeze. "
+    "If you're heading out later, a light jacket should be plenty. "
+    "Would you like me to check tomorrow's forecast as well?"
+)
+
+SAMPLE_MARKDOWN = (
+    "## Weather in **Paris**\n"
+    "- Temperature: 18-21°C, humidity ~60%\n"
+    "- Wind: light & steady\n\n"
+    "Check [the forecast](https://www.meteo.fr/forecast?city=paris) or https://weather.com/paris for updates. "
+    "Tesla (`TSLA`) is at **$242.50**, up 3.2% today -- a _strong_ session.\n"
+)
+
+
+# (raw reply, expected speech) pairs checked before the benchmark, streamed and whole
+REGRESSION_CASES = [
+    ("Temperatures of 18-21°C today.", "Temperatures of 18 to 21 degrees Celsius today."),
+    ("Open 9–17 on weekdays.", "Open 9 to 17 on weekdays."),
+    ("Prices from 1.5-2.5 million.", "Prices from 1.5 to 2.5 million."),
+    ("Departing 2025-01-15, back 2025-01-22.", "Departing 2025-01-15, back 2025-01-22."),
+    ("Call 555-1234 for details.", "Call 555-1234 for details."),
+    ("That is 5 - 3 = 2.", "That is 5 - 3 = 2."),
+    ("Flight AB-123 leaves at gate 4.", "Flight AB-123 leaves at gate 4."),
+    ("Steps 1-2-3 are done.", "Steps 1-2-3 are done."),
+]
+
+
+def check_regressions(chunk_size: int = 4) -> List[str]:
+    """Run REGRESSION_CASES through the whole-text and streaming paths; returns the failures."""
+    failures = []
+    for raw, expected in REGRESSION_CASES:
+        for label, spoken in (
+            ("whole", clean_text_for_tts(raw)),
+            ("stream", "".join(sanitize_stream(_chunks(raw, chunk_size))).strip()),
+        ):
+            if spoken != expected:
+                failures.append(f"{label}: {raw!r} -> {spoken!r}, expected {expected!r}")
+    return failures
+
+
+def _chunks(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def benchmark(repeats: int = 2000, chunk_size: int = 4) -> None:
+    """Compare the legacy per-chunk cleaner with the streaming sanitizer on token-sized chunks."""
+    for name, reply in (("plain reply", SAMPLE_PLAIN), ("markdown reply", SAMPLE_MARKDOWN)):
+        chunks = _chunks(reply, chunk_size)
+        total_chars = len(reply) * repeats
+        print(f"\n{name}: {len(chunks)} chunks of {chunk_size} chars, {repeats} replies")
+
+        def run(label: str, clean_stream: Callable[[List[str]], str]) -> None:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                output = clean_stream(chunks)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {label:<10} {repeats * len(chunks) / elapsed:>10,.0f} chunks/s "
+                f"{total_chars / elapsed / 1e6:>6.2f} MB/s -> {output[:100]!r}"
+            )
+
+        run("legacy", lambda cs: "".join(_legacy_clean_text_for_tts(c) for c in cs))
+        run("streaming", lambda cs: "".join(sanitize_stream(cs)))
+
+
+if __name__ == "__main__":
+    failures = check_regressions()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(REGRESSION_CASES)} regression cases, {len(failures)} failures")
+    if failures:
+        raise SystemExit(1)
+    benchmark()
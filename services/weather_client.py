@@ -0,0 +1,222 @@
+import os
+import time
+import asyncio
+import weakref
+from typing import Any, Dict, Optional
+import httpx
+from loguru import logger
+from services.ttl_cache import TTLCache
+from services.async_runner import drop_closed_loops
+from services.tool_executor import tool_executor
+
+# Configuration
+OPENWEATHERMAP_URL = "https://api.openweathermap.org"
+WEATHER_TTL_SECONDS = float(os.getenv("WEATHER_TTL_SECONDS", "600"))
+WEATHER_TIMEOUT_SECONDS = float(os.getenv("WEATHER_TIMEOUT_SECONDS", "5"))
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+
+
+def format_weather(city: str, data: Dict[str, Any]) -> str:
+    """Short, speakable summary of an OpenWeatherMap current-weather payload."""
+    main = data.get("main", {})
+    wind = data.get("wind", {})
+    description = (data.get("weather") or [{}])[0].get("description", "unknown conditions")
+    return (
+        f"🌤 Weather in {city.title()}:\n"
+        f"{description.capitalize()}, {main.get('temp', 'N/A')}°C "
+        f"(feels like {main.get('feels_like', 'N/A')}°C). "
+        f"Humidity {main.get('humidity', 'N/A')}%, wind {wind.get('speed', 'N/A')} m/s."
+    )
+
+
+class WeatherClient:
+    """
+    OpenWeatherMap client with pooled HTTP connections, a per-city TTL cache
+    and coalescing of concurrent lookups for the same city.
+
+    The async path keeps one connection-pooled ``httpx.AsyncClient`` per event
+    loop (the FastRTC app and Streamlit share the background loop; clients of
+    loops that have since closed are dropped). The sync path, used
+    by ``agent.invoke`` callers, shares the same cache through a pooled
+    ``httpx.Client``.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = OPENWEATHERMAP_URL,
+        ttl: float = WEATHER_TTL_SECONDS,
+        timeout: float = WEATHER_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sync_transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.cache = TTLCache(max_entries=512)
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._sync_client: Optional[httpx.Client] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.upstream_calls = 0
+
+    @staticmethod
+    def _key(city: str) -> str:
+        return " ".join(city.lower().split())
+
+    def _params(self, city: str) -> Dict[str, str]:
+        # Read lazily so a .env loaded after import is still picked up
+        api_key = self.api_key or os.getenv("OPENWEATHERMAP_API_KEY", "")
+        return {"q": city, "appid": api_key, "units": "metric"}
+
+    # ----------------------------- async -----------------------------
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            drop_closed_loops(self._async_clients)
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=POOL_LIMITS,
+                transport=self._transport,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def aget_current(self, city: str) -> Dict[str, Any]:
+        """Current weather JSON for a city (cached, coalesced)."""
+        key = self._key(city)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.record("hits")
+            return cached
+
+        # Coalesce only within one event loop; futures cannot be awaited across loops
+        loop = asyncio.get_running_loop()
+        inflight_key = f"{id(loop)}:{key}"
+        future = self._inflight.get(inflight_key)
+        if future is not None:
+            self.cache.record("coalesced")
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[inflight_key] = future
+        self.cache.record("misses")
+        try:
+            self.upstream_calls += 1
+            response = await self._async_client().get("/data/2.5/weather", params=self._params(city))
+            response.raise_for_status()
+            data = response.json()
+            self.cache.set(key, data, self.ttl)
+            self.cache.record("loads")
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.cache.record("errors")
+            future.set_exception(e)
+            # Mark retrieved so an exception with no waiters is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def aclose(self) -> None:
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    # ----------------------------- sync -----------------------------
+
+    def get_current(self, city: str) -> Dict[str, Any]:
+        """Sync variant for thread-pool callers; shares the cache and single-flights per city."""
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=POOL_LIMITS,
+                transport=self._sync_transport,
+            )
+
+        def load():
+            self.upstream_calls += 1
+            response = self._sync_client.get("/data/2.5/weather", params=self._params(city))
+            response.raise_for_status()
+            return response.json()
+
+        return self.cache.get_or_load(self._key(city), load, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["upstream_calls"] = self.upstream_calls
+        return stats
+
+
+# Global client instance
+weather_client = WeatherClient()
+# Hit rates on /metrics, next to the latency of the tool that reads through this cache
+tool_executor.metrics.register_cache("weather", weather_client.stats, ["get_weather"])
+
+
+# ----------------------------- fake server -----------------------------
+
+def create_fake_weather_app(delay: float = 0.05):
+    """
+    Local stand-in for OpenWeatherMap's /data/2.5/weather endpoint (ASGI app).
+    Serve it with uvicorn, or mount it in-process with ``httpx.ASGITransport``.
+    """
+    from fastapi import FastAPI, Query
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/data/2.5/weather")
+    async def current_weather(q: str = Query(...), appid: str = "", units: str = "metric"):
+        app.state.requests += 1
+        await asyncio.sleep(delay)
+        if q.lower() == "nowhere":
+            return JSONResponse({"cod": "404", "message": "city not found"}, status_code=404)
+        return {
+            "name": q,
+            "weather": [{"description": "clear sky"}],
+            "main": {"temp": 21.5, "feels_like": 21.0, "humidity": 40},
+            "wind": {"speed": 3.1},
+        }
+
+    return app
+
+
+async def benchmark(requests: int = 200, cities: int = 5, delay: float = 0.05) -> None:
+    """Concurrent lookups against the fake server: upstream calls and latency, cold vs cached."""
+    app = create_fake_weather_app(delay)
+    client = WeatherClient(api_key="fake", base_url="http://fake-weather", transport=httpx.ASGITransport(app=app))
+    names = [f"City {i % cities}" for i in range(requests)]
+
+    async def timed(name):
+        start = time.perf_counter()
+        await client.aget_current(name)
+        return time.perf_counter() - start
+
+    for label in ("cold", "cached"):
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(timed(name) for name in names)))
+        wall = time.perf_counter() - start
+        logger.info(
+            f"{label}: {requests} lookups for {cities} cities in {wall * 1000:.1f}ms | "
+            f"p50={latencies[len(latencies) // 2] * 1000:.2f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}ms | "
+            f"upstream requests so far={app.state.requests}"
+        )
+    logger.info(f"cache stats: {client.stats()}")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -1,12 +1,7 @@
 import os
 from langchain.tools import tool
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from loguru import logger
-
-# Configuration
-CHROMA_PATH = "chroma_db"
-EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+from services.retriever_service import retriever_service
 
 @tool
 def database_search(query: str) -> str:
@@ -23,19 +18,11 @@ def database_search(query: str) -> str:
     try:
         logger.info(f"🔍 Searching database for: {query}")
         
-        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-        
-        # Initialize Chroma client
-        if not os.path.exists(CHROMA_PATH):
+        if not retriever_service.is_available():
             return "❌ Database not found. Please upload documents using the ingestion app first."
-            
-        db = Chroma(
-            persist_directory=CHROMA_PATH, 
-            embedding_function=embeddings
-        )
         
-        # Search for top 3 relevant chunks
-        results = db.similarity_search(query, k=3)
+        # Search for top 3 relevant chunks (shared model + Chroma handle)
+        results = retriever_service.search(query, k=3)
         
         if not results:
             return f"❌ No relevant information found in the database for '{query}'."
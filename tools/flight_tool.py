@@ -1,9 +1,9 @@
-import os
 from dotenv import load_dotenv
 from langchain.tools import tool
-from langchain_community.document_loaders.firecrawl import FireCrawlLoader
 from loguru import logger
 from typing import Optional
+from services.scrape_cache import log_payload_sizes, scrape_service
+from services.travel_extract import extract_flights, fallback_excerpt, format_table
 
 load_dotenv()
 
@@ -15,7 +15,7 @@ def search_flights(
     return_date: Optional[str] = None
 ) -> str:
     """
-    Search for flights on Kayak using Firecrawl scraping.
+    Search for flights on Kayak using Firecrawl scraping (cached for a short while).
     
     Args:
         origin: Departure city or airport code (e.g., "New York" or "JFK")
@@ -24,7 +24,7 @@ def search_flights(
         return_date: Optional return date in YYYY-MM-DD format for round trips
     
     Returns:
-        Formatted flight information from Kayak
+        A compact table of the cheapest flights found on Kayak
     """
     try:
         # Build Kayak URL
@@ -38,29 +38,23 @@ def search_flights(
         
         logger.info(f"Scraping Kayak flights: {url}")
         
-        # Use FireCrawlLoader from LangChain
-        loader = FireCrawlLoader(
-            api_key=os.getenv("FIRECRAWL_API_KEY"),
-            url=url,
-            mode="scrape"
-        )
+        content, metadata, from_cache = scrape_service.scrape(url)
         
-        docs = loader.load()
-        
-        if not docs:
+        if not content:
             return f"❌ Could not fetch flight data from Kayak for {origin} to {destination}"
         
-        doc = docs[0]
-        content = doc.page_content
-        metadata = doc.metadata
+        # Keep only the result rows instead of the raw page
+        table = format_table(extract_flights(content))
+        extracted = table or fallback_excerpt(content)
+        log_payload_sizes("flights", content, extracted, from_cache)
         
         # Format output
         output = f"✈️ *Flights from {origin} to {destination}*\n"
         output += f"📅 Departure: {departure_date}\n"
         if return_date:
             output += f"📅 Return: {return_date}\n"
-        output += f"\n--- Extracted Content ---\n"
-        output += f"{content[:2500]}\n\n"  # Limit content
+        output += f"\n--- {'Cheapest Flights' if table else 'Extracted Content'} ---\n"
+        output += f"{extracted}\n\n"
         output += f"🔗 Full details: {url}"
         
         return output
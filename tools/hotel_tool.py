@@ -1,8 +1,8 @@
-import os
 from dotenv import load_dotenv
 from langchain.tools import tool
-from langchain_community.document_loaders.firecrawl import FireCrawlLoader
 from loguru import logger
+from services.scrape_cache import log_payload_sizes, scrape_service
+from services.travel_extract import extract_hotels, fallback_excerpt, format_table
 
 load_dotenv()
 
@@ -14,7 +14,7 @@ def search_hotels(
     guests: int = 2
 ) -> str:
     """
-    Search for hotels on Kayak using Firecrawl scraping.
+    Search for hotels on Kayak using Firecrawl scraping (cached for a short while).
     
     Args:
         location: City or location name (e.g., "Paris" or "New York")
@@ -23,7 +23,7 @@ def search_hotels(
         guests: Number of guests (default: 2)
     
     Returns:
-        Formatted hotel information from Kayak
+        A compact table of the cheapest hotels found on Kayak
     """
     try:
         # Build Kayak URL
@@ -32,21 +32,15 @@ def search_hotels(
         
         logger.info(f"Scraping Kayak hotels: {url}")
         
-        # Use FireCrawlLoader from LangChain
-        loader = FireCrawlLoader(
-            api_key=os.getenv("FIRECRAWL_API_KEY"),
-            url=url,
-            mode="scrape"
-        )
+        content, metadata, from_cache = scrape_service.scrape(url)
         
-        docs = loader.load()
-        
-        if not docs:
+        if not content:
             return f"❌ Could not fetch hotel data from Kayak for {location}"
         
-        doc = docs[0]
-        content = doc.page_content
-        metadata = doc.metadata
+        # Keep only the result rows instead of the raw page
+        table = format_table(extract_hotels(content))
+        extracted = table or fallback_excerpt(content)
+        log_payload_sizes("hotels", content, extracted, from_cache)
         
         # Format output
         output = f"🏨 *Hotels in {location}*\n"
@@ -58,8 +52,8 @@ def search_hotels(
         if metadata.get("title"):
             output += f"📄 Page: {metadata['title']}\n"
         
-        output += f"\n--- Extracted Content ---\n"
-        output += f"{content[:2500]}\n\n"  # Limit content
+        output += f"\n--- {'Cheapest Hotels' if table else 'Extracted Content'} ---\n"
+        output += f"{extracted}\n\n"
         output += f"🔗 Full details: {url}"
         
         return output
@@ -1,5 +1,5 @@
-import yfinance as yf
 from langchain.tools import tool
+from services.stock_data import stock_data_service
 
 # ==========================
 # YFINANCE TOOLS
@@ -9,25 +9,40 @@ from langchain.tools import tool
 def get_stock_price(ticker: str) -> str:
     """Get the latest stock price for a ticker symbol like AAPL or TSLA."""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.history(period="1d")
+        price = stock_data_service.get_price(ticker)
 
-        if info.empty:
+        if price is None:
             return f"No stock data found for '{ticker}'."
 
-        price = info["Close"].iloc[-1]
         return f"📈 {ticker.upper()} Current Price: {price:.2f} USD"
 
     except Exception as e:
         return f"Error fetching stock price: {str(e)}"
 
 
+@tool
+def get_stock_prices(tickers: list[str]) -> str:
+    """Get the latest stock prices for several ticker symbols at once, e.g. ["AAPL", "MSFT", "TSLA"]."""
+    try:
+        prices = stock_data_service.get_prices(tickers)
+
+        lines = []
+        for symbol, price in prices.items():
+            if price is None:
+                lines.append(f"No stock data found for '{symbol}'.")
+            else:
+                lines.append(f"📈 {symbol} Current Price: {price:.2f} USD")
+        return "\n".join(lines) if lines else "No tickers given."
+
+    except Exception as e:
+        return f"Error fetching stock prices: {str(e)}"
+
+
 @tool
 def get_company_info(ticker: str) -> str:
     """Get company name, sector, and market cap for a given stock ticker."""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = stock_data_service.get_company_info(ticker)
 
         name = info.get("longName", "Unknown")
         sector = info.get("sector", "Unknown")
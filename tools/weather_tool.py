@@ -1,7 +1,7 @@
-import os
+import httpx
 from dotenv import load_dotenv
-from langchain_community.document_loaders import WeatherDataLoader
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
+from services.weather_client import format_weather, weather_client
 
 load_dotenv()
 
@@ -9,22 +9,36 @@ load_dotenv()
 # WEATHER TOOL
 # ==========================
 
-@tool
-def get_weather(city: str) -> str:
+def _get_weather(city: str) -> str:
     """Get current weather for a city using OpenWeatherMap."""
     try:
-        loader = WeatherDataLoader.from_params(
-            [city],
-            openweathermap_api_key=os.getenv("OPENWEATHERMAP_API_KEY")
-        )
+        return format_weather(city, weather_client.get_current(city))
 
-        docs = loader.load()  # returns list of Document objects
-        if not docs:
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
             return f"No weather data found for {city}."
+        return f"Error fetching weather: {str(e)}"
+    except Exception as e:
+        return f"Error fetching weather: {str(e)}"
 
-        data = docs[0].page_content  # raw text
 
-        return f"🌤 Weather in {city.title()}:\n{data}"
+async def _aget_weather(city: str) -> str:
+    """Get current weather for a city using OpenWeatherMap."""
+    try:
+        return format_weather(city, await weather_client.aget_current(city))
 
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return f"No weather data found for {city}."
+        return f"Error fetching weather: {str(e)}"
     except Exception as e:
         return f"Error fetching weather: {str(e)}"
+
+
+# Async agents (backend /llm/stream, voice streaming) await the pooled client
+# instead of blocking the event loop; agent.invoke callers use the sync path
+get_weather = StructuredTool.from_function(
+    func=_get_weather,
+    coroutine=_aget_weather,
+    name="get_weather",
+)